@@ -12,22 +12,40 @@ Prerequisites:
 4. Run: python KevinTheAntagonizerClaudeCodeNotesMaker.py -scan <folder>
 """
 
+from __future__ import annotations
+
 import json
+import hashlib
+import mmap
+import re
 import sqlite3
 import asyncio
 import argparse
 import sys
 import os
+import stat
 import signal
 import atexit
+import threading
+import time
+import contextlib
+import glob
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import groupby
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Iterable, TYPE_CHECKING
 import logging
-from tqdm import tqdm
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import logging.handlers
+import queue
 import random
 
+# tqdm and the Claude Agent SDK are imported where they are used, so that
+# -stats, -list-failed and --list-models start without loading them
+if TYPE_CHECKING:
+    from tqdm import tqdm
+
 # ==============================================================================
 # Concurrency Control for Claude API Calls
 # ==============================================================================
@@ -36,18 +54,42 @@ import random
 CLAUDE_CONCURRENCY_LIMIT = 100  # Effectively unlimited - all workers can run
 _claude_semaphore: Optional[asyncio.Semaphore] = None
 
-# REAL Claude Agent SDK imports
-from claude_agent_sdk import (
-    query,
-    ClaudeAgentOptions,
-    ClaudeSDKClient,
-    AssistantMessage,
-    TextBlock,
-    ClaudeSDKError,
-    CLINotFoundError,
-    ProcessError,
-    CLIJSONDecodeError
-)
+# Cleaned transcripts the producer may hold ahead of the workers, per worker.
+# Bounds producer memory to O(workers) regardless of how many tasks are pending
+TRANSCRIPT_QUEUE_DEPTH_PER_WORKER = 4
+
+# Seconds of unused request budget the rate limiter may bank for a burst
+RATE_LIMIT_BURST_SECONDS = 10
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all workers: at most max_rpm Claude requests per
+    minute, with short bursts up to RATE_LIMIT_BURST_SECONDS of budget.
+    Workers wait only when the budget is exhausted. max_rpm=0 disables it.
+    """
+
+    def __init__(self, max_rpm: int):
+        self.rate = max_rpm / 60.0  # Tokens per second
+        self.capacity = max(1.0, self.rate * RATE_LIMIT_BURST_SECONDS)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait for one request's worth of budget"""
+        if not self.rate:
+            return
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
 
 # ==============================================================================
 # Safe Progress Bar Helpers (Windows Errno 22 workaround)
@@ -80,6 +122,20 @@ def safe_pbar_set_description(pbar: tqdm, desc: str) -> bool:
             return False
         raise
 
+async def track_progress(pbar: tqdm, progress: Dict[str, int], interval: float = 0.5):
+    """
+    Mirror a completion counter into a progress bar every interval seconds
+
+    Workers only bump progress['done']; repaints (and tqdm's internal lock)
+    stay off the completion path. Runs until cancelled, then syncs once more.
+    """
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            safe_pbar_update(pbar, progress['done'] - pbar.n)
+    finally:
+        safe_pbar_update(pbar, progress['done'] - pbar.n)
+
 def safe_pbar_close(pbar: tqdm) -> bool:
     """Safely close progress bar, catching Errno 22 on Windows."""
     if pbar is None:
@@ -113,6 +169,7 @@ AVAILABLE_MODELS = {
 DEFAULT_MODEL = "sonnet-4.5"
 DEFAULT_WORKERS = 1
 DEFAULT_BATCH_SIZE = 10
+DEFAULT_MAX_RPM = 60
 
 # Directory structure
 CONFIG_DIR = "config"
@@ -179,6 +236,36 @@ def setup_signal_handlers():
         signal.signal(signal.SIGBREAK, signal_handler)
 
 
+# ==============================================================================
+# Logging
+# ==============================================================================
+# Workers only enqueue records; a listener thread does the file/console
+# writes, so a slow disk never stalls the event loop.
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging(log_file: Path):
+    """Route root logging through a QueueHandler (first call wins)"""
+    global _log_listener
+    if _log_listener is not None:
+        return
+
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    handlers = [logging.FileHandler(log_file), logging.StreamHandler()]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(-1)
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    _log_listener = logging.handlers.QueueListener(log_queue, *handlers)
+    _log_listener.start()
+    # Drain queued records before the interpreter exits
+    atexit.register(_log_listener.stop)
+
+
 # ==============================================================================
 # Model Discovery Functions
 # ==============================================================================
@@ -380,8 +467,9 @@ def discover_models_from_cli() -> Optional[Dict[str, str]]:
 
     try:
         # Try claude-code models list
+        # Run by absolute path so neither attempt searches PATH again
         result = subprocess.run(
-            ['claude-code', 'models', 'list'],
+            [cli_path, 'models', 'list'],
             capture_output=True,
             text=True,
             timeout=5
@@ -390,7 +478,7 @@ def discover_models_from_cli() -> Optional[Dict[str, str]]:
         if result.returncode != 0:
             # Try alternative command format
             result = subprocess.run(
-                ['claude-code', '--list-models'],
+                [cli_path, '--list-models'],
                 capture_output=True,
                 text=True,
                 timeout=5
@@ -579,6 +667,7 @@ class CLIArgs:
         self.recursive: bool = False
         self.workers: int = DEFAULT_WORKERS
         self.batch_size: int = DEFAULT_BATCH_SIZE
+        self.max_rpm: int = DEFAULT_MAX_RPM
         self.db_path: Path = get_db_dir() / DEFAULT_DB_NAME
         self.reset_db: bool = False
         self.list_failed: bool = False
@@ -679,7 +768,7 @@ class Config:
     # Quality control settings
     MIN_QUALITY_LENGTH = 1500
     MIN_QUALITY_SCORE = 0.7
-    MAX_FILE_SIZE = 50000  # Characters
+    MAX_FILE_SIZE = 50000  # Characters, checked on the cleaned transcript
 
     # Tools the agent can use
     ALLOWED_TOOLS = ["Read", "Write", "Bash"]  # Basic file operations only
@@ -763,6 +852,13 @@ Available Models (use --list-models for current list):
         metavar='<num>',
         help=f'Files per batch/subagent (default: {DEFAULT_BATCH_SIZE})'
     )
+    processing.add_argument(
+        '-max-rpm',
+        type=int,
+        default=DEFAULT_MAX_RPM,
+        metavar='<num>',
+        help=f'Max Claude requests per minute across all workers, 0 = unlimited (default: {DEFAULT_MAX_RPM})'
+    )
 
     # Database management
     database = parser.add_argument_group('database management')
@@ -846,14 +942,17 @@ def validate_args(args: argparse.Namespace) -> CLIArgs:
     if args.scan_folders:
         # Validate scan folders
         for folder_str in args.scan_folders:
-            folder = Path(folder_str).resolve()
-            if not folder.exists():
+            folder = os.path.realpath(folder_str)
+            # One stat per folder covers both the existence and directory checks
+            try:
+                st = os.stat(folder)
+            except OSError:
                 print(f"[ERROR] Scan folder does not exist: {folder}")
                 sys.exit(1)
-            if not folder.is_dir():
+            if not stat.S_ISDIR(st.st_mode):
                 print(f"[ERROR] Scan path is not a directory: {folder}")
                 sys.exit(1)
-            cli_args.scan_folders.append(folder)
+            cli_args.scan_folders.append(Path(folder))
     elif not any([args.stats, args.list_failed, args.retry_failed, args.list_models]):
         # Scan folders are required unless doing database management operations or listing models
         print("[ERROR] -scan argument is required (unless using -stats, -list-failed, -retry-failed, or --list-models)")
@@ -871,6 +970,12 @@ def validate_args(args: argparse.Namespace) -> CLIArgs:
         sys.exit(1)
     cli_args.batch_size = args.batch_size
 
+    # Validate request rate
+    if args.max_rpm < 0:
+        print(f"[ERROR] Max RPM must be >= 0 (got: {args.max_rpm})")
+        sys.exit(1)
+    cli_args.max_rpm = args.max_rpm
+
     # Validate system prompt file
     if args.system_prompt:
         prompt_file = Path(args.system_prompt).resolve()
@@ -961,6 +1066,7 @@ def print_configuration(cli_args: CLIArgs):
     print(f"   - Recursive:   {cli_args.recursive}")
     print(f"   - Workers:     {cli_args.workers}")
     print(f"   - Batch Size:  {cli_args.batch_size}")
+    print(f"   - Max RPM:     {cli_args.max_rpm or 'unlimited'}")
     model_source = "CLI-discovered" if _DISCOVERED_MODELS else "static"
     print(f"   - Model:       {cli_args.model_name} ({cli_args.model}) [{model_source}]")
 
@@ -1001,182 +1107,446 @@ def print_configuration(cli_args: CLIArgs):
 # Database Manager
 # ==============================================================================
 
+if os.name == 'nt':
+    import msvcrt
+
+    def try_lock_file(f) -> bool:
+        """Take a non-blocking exclusive lock on an open file; False if another process holds it"""
+        try:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+else:
+    import fcntl
+
+    def try_lock_file(f) -> bool:
+        """Take a non-blocking exclusive lock on an open file; False if another process holds it"""
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+
 class DatabaseManager:
-    """Manages SQLite database for task tracking"""
+    """
+    Manages SQLite database for task tracking
+
+    Holds a single persistent connection for the lifetime of the manager
+    instead of reconnecting per operation. The connection runs in autocommit
+    mode (isolation_level=None) with WAL journaling; multi-statement writes
+    open explicit transactions. All access is serialized through a lock so
+    the connection can be shared with executor threads.
+
+    Task status updates are buffered and written in one transaction every
+    UPDATE_BATCH_SIZE updates or UPDATE_FLUSH_SECONDS, whichever comes first
+    (the age limit is enforced by flush_periodically, which main() runs).
+    Each buffered update is also appended to a JSONL journal next to the
+    database and replayed on the next start if the process dies before a
+    flush. Reads and close() flush first, so callers always see their writes.
+    Every process writes its own journal (<db>.updates.<pid>.jsonl) and holds
+    an exclusive lock on it, so a second manager - e.g. -stats from another
+    terminal - only replays journals whose owner is gone. Journaled updates
+    carry absolute values (attempts included), so replaying one twice is
+    harmless.
+
+    Coroutines use the a_* wrappers, which run the same methods on a
+    dedicated single-thread executor so SQLite never blocks the event loop.
+
+    Queries go through a second, read-only connection on its own thread.
+    Under WAL a reader sees the last committed snapshot without waiting on
+    the writer, so cache lookups and task fetches don't queue behind commits.
+    """
+
+    # Connection PRAGMAs applied once when the connection is opened
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-20000",    # ~20 MB page cache
+        "PRAGMA mmap_size=268435456",  # 256 MB
+        "PRAGMA busy_timeout=5000",
+    )
+
+    # Applied to the read-only connection (journal settings belong to the writer)
+    READER_PRAGMAS = (
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-20000",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA busy_timeout=5000",
+    )
+
+    # Status update buffering (one commit per batch instead of per task)
+    UPDATE_BATCH_SIZE = 64
+    UPDATE_FLUSH_SECONDS = 1.0
+    # Matches every process's journal, plus the shared one older versions wrote
+    UPDATE_JOURNAL_GLOB = ".updates*.jsonl"
 
     def __init__(self, db_path: Path, reset: bool = False):
         self.db_path = str(db_path)
+        self.journal_path = f"{self.db_path}.updates.{os.getpid()}.jsonl"
         if reset and db_path.exists():
             os.remove(self.db_path)
+            # WAL mode leaves sidecar files next to the database
+            for suffix in ('-wal', '-shm'):
+                if os.path.exists(self.db_path + suffix):
+                    os.remove(self.db_path + suffix)
+            # Journals of finished runs would otherwise replay into the new database
+            for journal_path in self._update_journal_paths():
+                with contextlib.suppress(OSError):
+                    os.remove(journal_path)
             print(f"[INFO] Database reset: {self.db_path}")
+
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db')
+        self._pending_updates: List[Dict] = []
+        # task id -> attempts after its buffered updates (not yet in the database)
+        self._pending_attempts: Dict[int, int] = {}
+        self._last_flush = time.monotonic()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        # Rows support both row['column'] and row[index] without a dict per row
+        self.conn.row_factory = sqlite3.Row
+        for pragma in self.PRAGMAS:
+            self.conn.execute(pragma)
+
         self.init_database()
+        self._replay_update_journals()
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        # Held until close(): tells other processes this journal is live
+        try_lock_file(self._journal)
+
+        # Read-only connection, opened after the schema exists
+        self._read_lock = threading.Lock()
+        self._read_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-read')
+        self.reader = sqlite3.connect(Path(self.db_path).resolve().as_uri() + "?mode=ro",
+                                      uri=True, check_same_thread=False)
+        self.reader.row_factory = sqlite3.Row
+        for pragma in self.READER_PRAGMAS:
+            self.reader.execute(pragma)
+
+    def close(self):
+        """Flush buffered updates and close the connection (safe to call more than once)"""
+        # Let queued executor calls finish before the connections go away
+        self._read_executor.shutdown(wait=True)
+        self._executor.shutdown(wait=True)
+        with self._read_lock:
+            if self.reader is not None:
+                self.reader.close()
+                self.reader = None
+        with self._lock:
+            if self.conn is not None:
+                self._flush_updates_locked()
+                self._journal.close()
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(self.journal_path)
+                # Refresh planner statistics so the partial index gets picked
+                self.conn.execute("PRAGMA optimize")
+                self.conn.close()
+                self.conn = None
+
+    async def _run(self, func, *args, **kwargs):
+        """Run a blocking database method on the dedicated DB thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def _run_read(self, func, *args):
+        """Run a blocking query method on the reader thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._read_executor, partial(func, *args))
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[sqlite3.Row]:
+        """Run a SELECT on the read-only connection"""
+        with self._read_lock:
+            return self.reader.execute(sql, params).fetchall()
+
+    async def a_get_pending_tasks(self, limit: int, retry_failed: bool = False) -> List[sqlite3.Row]:
+        """Async get_pending_tasks (flushes on the DB thread, then queries on the reader thread)"""
+        await self._run(self.flush_updates)
+        return await self._run_read(self._select_pending_tasks, limit, retry_failed)
+
+    async def flush_periodically(self):
+        """
+        Flush buffered status updates every UPDATE_FLUSH_SECONDS until cancelled
+
+        update_task_status only checks staleness when the next update arrives;
+        this keeps finished statuses visible to other readers (-stats, sqlite3)
+        while workers sit in long synthesis calls.
+        """
+        while True:
+            await asyncio.sleep(self.UPDATE_FLUSH_SECONDS)
+            await self._run(self.flush_updates)
+
+    async def a_update_task_status(self, task_id: int, status: str, **kwargs):
+        """Async update_task_status (runs on the DB thread)"""
+        return await self._run(self.update_task_status, task_id, status, **kwargs)
+
+    async def a_get_cached_synthesis(self, fingerprint: str) -> Optional[Tuple[str, float]]:
+        """Async get_cached_synthesis (runs on the reader thread)"""
+        return await self._run_read(self.get_cached_synthesis, fingerprint)
+
+    async def a_cache_synthesis(self, fingerprint: str, notes_path: str, quality_score: float):
+        """Async cache_synthesis (runs on the DB thread)"""
+        return await self._run(self.cache_synthesis, fingerprint, notes_path, quality_score)
 
     def init_database(self):
         """Initialize database schema"""
-        conn = sqlite3.connect(self.db_path)
-        cur = conn.cursor()
-
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                srt_path TEXT UNIQUE NOT NULL,
-                course_name TEXT NOT NULL,
-                lecture_name TEXT NOT NULL,
-                file_size_kb INTEGER NOT NULL,
-                status TEXT DEFAULT 'pending',
-                attempts INTEGER DEFAULT 0,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                completed_at TEXT,
-                error_message TEXT,
-                quality_score REAL,
-                tokens_used INTEGER
-            )
-        """)
+        with self._lock:
+            cur = self.conn.cursor()
 
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS processing_stats (
-                batch_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                started_at TEXT NOT NULL,
-                completed_at TEXT,
-                files_processed INTEGER,
-                files_failed INTEGER,
-                avg_quality REAL
-            )
-        """)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    srt_path TEXT UNIQUE NOT NULL,
+                    course_name TEXT NOT NULL,
+                    lecture_name TEXT NOT NULL,
+                    file_size_kb INTEGER NOT NULL,
+                    status TEXT DEFAULT 'pending',
+                    attempts INTEGER DEFAULT 0,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    completed_at TEXT,
+                    error_message TEXT,
+                    quality_score REAL,
+                    tokens_used INTEGER
+                )
+            """)
 
-        conn.commit()
-        conn.close()
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS processing_stats (
+                    batch_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    started_at TEXT NOT NULL,
+                    completed_at TEXT,
+                    files_processed INTEGER,
+                    files_failed INTEGER,
+                    avg_quality REAL
+                )
+            """)
+
+            # Dequeue index: equality on status, then file_size_kb so ORDER BY
+            # needs no sort; attempts is filtered from the index entry itself
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_tasks_status_size_attempts
+                ON tasks(status, file_size_kb, attempts)
+            """)
 
-    def add_task(self, srt_path: str, course_name: str, lecture_name: str, file_size_kb: int) -> bool:
-        """Add a new task to the database"""
-        conn = sqlite3.connect(self.db_path)
-        cur = conn.cursor()
+            # Partial index over failed rows only, already in list_failed_tasks order
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_tasks_failed
+                ON tasks(lecture_name) WHERE status = 'failed'
+            """)
 
-        try:
+            # Notes already synthesized, keyed by normalized transcript fingerprint
             cur.execute("""
-                INSERT OR IGNORE INTO tasks
-                (srt_path, course_name, lecture_name, file_size_kb)
-                VALUES (?, ?, ?, ?)
-            """, (srt_path, course_name, lecture_name, file_size_kb))
+                CREATE TABLE IF NOT EXISTS synthesis_cache (
+                    fingerprint TEXT PRIMARY KEY,
+                    notes_path TEXT NOT NULL,
+                    quality_score REAL,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
 
-            conn.commit()
-            return cur.rowcount > 0
-        except Exception as e:
-            logging.error(f"Failed to add task: {e}")
-            return False
-        finally:
-            conn.close()
+    def add_task(self, srt_path: str, course_name: str, lecture_name: str, file_size_kb: int) -> bool:
+        """Add a new task to the database"""
+        return self.add_tasks_batch([(srt_path, course_name, lecture_name, file_size_kb)]) > 0
 
-    def add_tasks_batch(self, tasks: List[Tuple[str, str, str, int]]) -> int:
+    def add_tasks_batch(self, tasks: Iterable[Tuple[str, str, str, int]]) -> int:
         """
         Add multiple tasks to the database in a single transaction.
 
         Args:
-            tasks: List of tuples (srt_path, course_name, lecture_name, file_size_kb)
+            tasks: Iterable of tuples (srt_path, course_name, lecture_name, file_size_kb).
+                   Generators are consumed directly by executemany.
 
         Returns:
             Number of tasks actually added (excludes duplicates)
         """
-        if not tasks:
-            return 0
-
-        conn = sqlite3.connect(self.db_path)
-        cur = conn.cursor()
-
-        try:
-            # Get count before insert
-            cur.execute("SELECT COUNT(*) FROM tasks")
-            count_before = cur.fetchone()[0]
-
-            # Batch insert with executemany
-            cur.executemany("""
-                INSERT OR IGNORE INTO tasks
-                (srt_path, course_name, lecture_name, file_size_kb)
-                VALUES (?, ?, ?, ?)
-            """, tasks)
+        with self._lock:
+            cur = self.conn.cursor()
 
-            conn.commit()
-
-            # Get count after insert
-            cur.execute("SELECT COUNT(*) FROM tasks")
-            count_after = cur.fetchone()[0]
+            try:
+                # Take the write lock up front instead of upgrading mid-transaction
+                cur.execute("BEGIN IMMEDIATE")
+                changes_before = self.conn.total_changes
+
+                # Batch insert with executemany - one commit for the whole batch.
+                # Only a duplicate srt_path is skipped; any other constraint
+                # violation still raises (OR IGNORE would hide it)
+                cur.executemany("""
+                    INSERT INTO tasks
+                    (srt_path, course_name, lecture_name, file_size_kb)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(srt_path) DO NOTHING
+                """, tasks)
+
+                # Skipped duplicates don't count as changes
+                added = self.conn.total_changes - changes_before
+                cur.execute("COMMIT")
+
+                return added
+            except Exception as e:
+                logging.error(f"Failed to add tasks batch: {e}")
+                if self.conn.in_transaction:
+                    cur.execute("ROLLBACK")
+                return 0
 
-            return count_after - count_before
-        except Exception as e:
-            logging.error(f"Failed to add tasks batch: {e}")
-            conn.rollback()
-            return 0
-        finally:
-            conn.close()
+    def get_pending_tasks(self, limit: int, retry_failed: bool = False) -> List[sqlite3.Row]:
+        """
+        Get pending tasks from database
 
-    def get_pending_tasks(self, limit: int, retry_failed: bool = False) -> List[Dict]:
-        """Get pending tasks from database"""
-        conn = sqlite3.connect(self.db_path)
-        cur = conn.cursor()
+        Returns sqlite3.Row objects indexable by column name:
+        id, srt_path, course_name, lecture_name, file_size_kb
+        """
+        # Buffered status changes must be visible before picking work
+        self.flush_updates()
+        return self._select_pending_tasks(limit, retry_failed)
 
+    def _select_pending_tasks(self, limit: int, retry_failed: bool) -> List[sqlite3.Row]:
+        """Query pending (or retryable failed) tasks on the read-only connection"""
         if retry_failed:
             # Get failed tasks for retry
-            cur.execute("""
+            return self._query("""
                 SELECT id, srt_path, course_name, lecture_name, file_size_kb
                 FROM tasks
                 WHERE status = 'failed' AND attempts < 3
                 ORDER BY file_size_kb ASC
                 LIMIT ?
             """, (limit,))
-        else:
-            # Get normal pending tasks
-            cur.execute("""
-                SELECT id, srt_path, course_name, lecture_name, file_size_kb
-                FROM tasks
-                WHERE status = 'pending' AND attempts < 3
-                ORDER BY file_size_kb ASC
-                LIMIT ?
-            """, (limit,))
 
-        tasks = []
-        for row in cur.fetchall():
-            tasks.append({
-                'id': row[0],
-                'srt_path': row[1],
-                'course_name': row[2],
-                'lecture_name': row[3],
-                'file_size_kb': row[4]
-            })
-
-        conn.close()
-        return tasks
+        # Get normal pending tasks
+        return self._query("""
+            SELECT id, srt_path, course_name, lecture_name, file_size_kb
+            FROM tasks
+            WHERE status = 'pending' AND attempts < 3
+            ORDER BY file_size_kb ASC
+            LIMIT ?
+        """, (limit,))
 
     def update_task_status(self, task_id: int, status: str, **kwargs):
-        """Update task status in database"""
-        conn = sqlite3.connect(self.db_path)
-        cur = conn.cursor()
-
-        updates = [f"status = '{status}'"]
-        updates.append(f"attempts = attempts + 1")
+        """
+        Queue a task status update (written by the next flush)
 
+        The update is journaled immediately; the UPDATE itself is batched
+        with others and committed once the buffer is full or stale.
+        """
+        update = {'id': task_id, 'status': status}
         if status == 'completed':
-            updates.append(f"completed_at = '{datetime.now().isoformat()}'")
+            update['completed_at'] = datetime.now().isoformat()
+        for key in self.STATUS_UPDATE_COLUMNS[1:]:
+            if key in kwargs:
+                update[key] = kwargs[key]
+
+        with self._lock:
+            update['attempts'] = self._next_attempts_locked(task_id)
+            self._journal.write(json.dumps(update) + '\n')
+            self._journal.flush()
+            self._pending_updates.append(update)
+
+            if (len(self._pending_updates) >= self.UPDATE_BATCH_SIZE or
+                    time.monotonic() - self._last_flush >= self.UPDATE_FLUSH_SECONDS):
+                self._flush_updates_locked()
+
+    def _next_attempts_locked(self, task_id: int) -> int:
+        """Attempt count after one more update to task_id (caller holds the lock)"""
+        attempts = self._pending_attempts.get(task_id)
+        if attempts is None:
+            row = self.conn.execute("SELECT attempts FROM tasks WHERE id = ?", (task_id,)).fetchone()
+            attempts = row[0] if row and row[0] is not None else 0
+        attempts += 1
+        self._pending_attempts[task_id] = attempts
+        return attempts
+
+    def flush_updates(self):
+        """Write all buffered status updates to the database now"""
+        with self._lock:
+            self._flush_updates_locked()
+
+    # Optional columns a status update may set, in statement order
+    STATUS_UPDATE_COLUMNS = ('completed_at', 'error_message', 'quality_score', 'tokens_used')
+
+    @classmethod
+    def _status_update_shape(cls, update: Dict) -> Tuple[str, ...]:
+        """Optional columns set by an update; equal shapes share one statement"""
+        return tuple(key for key in cls.STATUS_UPDATE_COLUMNS if key in update)
 
-        for key, value in kwargs.items():
-            if key == 'error_message':
-                updates.append(f"error_message = '{value}'")
-            elif key == 'quality_score':
-                updates.append(f"quality_score = {value}")
-            elif key == 'tokens_used':
-                updates.append(f"tokens_used = {value}")
+    @staticmethod
+    def _status_update_sql(shape: Tuple[str, ...]) -> str:
+        """Build the parameterized UPDATE for one update shape"""
+        # Journals from older versions carry no attempts; those still increment
+        sets = ["status = ?", "attempts = COALESCE(?, attempts + 1)"] + [f"{key} = ?" for key in shape]
+        return f"UPDATE tasks SET {', '.join(sets)} WHERE id = ?"
 
-        query = f"UPDATE tasks SET {', '.join(updates)} WHERE id = ?"
-        cur.execute(query, (task_id,))
+    def _apply_updates(self, updates: List[Dict]):
+        """
+        Apply status updates in a single transaction (caller holds the lock)
+
+        Consecutive updates with the same shape go through one executemany,
+        which keeps per-task ordering while reusing the prepared statement.
+        """
+        cur = self.conn.cursor()
+        try:
+            cur.execute("BEGIN IMMEDIATE")
+            for shape, group in groupby(updates, key=self._status_update_shape):
+                cur.executemany(
+                    self._status_update_sql(shape),
+                    ([u['status'], u.get('attempts'), *(u[key] for key in shape), u['id']]
+                     for u in group)
+                )
+            cur.execute("COMMIT")
+        except Exception:
+            if self.conn.in_transaction:
+                cur.execute("ROLLBACK")
+            raise
+
+    def _flush_updates_locked(self):
+        """Commit buffered updates and truncate the journal (caller holds the lock)"""
+        self._last_flush = time.monotonic()
+        if not self._pending_updates:
+            return
 
-        conn.commit()
-        conn.close()
+        self._apply_updates(self._pending_updates)
+        self._pending_updates = []
+        self._pending_attempts.clear()
+        # Everything journaled so far is now in the database
+        self._journal.seek(0)
+        self._journal.truncate()
+
+    def _update_journal_paths(self) -> List[str]:
+        """Update journals next to the database, from any process"""
+        return glob.glob(glob.escape(self.db_path) + self.UPDATE_JOURNAL_GLOB)
+
+    def _replay_update_journals(self):
+        """Apply updates journaled by runs that exited before flushing them"""
+        for journal_path in self._update_journal_paths():
+            updates = []
+            try:
+                with open(journal_path, 'r', encoding='utf-8') as f:
+                    if not try_lock_file(f):
+                        continue  # Owner still running; it flushes its own journal
+
+                    for line in f:
+                        try:
+                            updates.append(json.loads(line))
+                        except ValueError:
+                            break  # Torn final line from a crash mid-write
+            except FileNotFoundError:
+                continue  # Removed by its owner or another replay meanwhile
+
+            if updates:
+                with self._lock:
+                    self._apply_updates(updates)
+                logging.info(f"Replayed {len(updates)} journaled status update(s) from {journal_path}")
+
+            # Replay is idempotent, so a journal that can't be removed yet
+            # (e.g. opened by another process on Windows) is simply replayed again
+            with contextlib.suppress(OSError):
+                os.remove(journal_path)
 
     def get_statistics(self) -> Dict:
         """Get processing statistics"""
-        conn = sqlite3.connect(self.db_path)
-        cur = conn.cursor()
+        self.flush_updates()
 
-        cur.execute("""
+        row = self._query("""
             SELECT
                 COUNT(*) as total,
                 SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed,
@@ -1184,10 +1554,7 @@ class DatabaseManager:
                 SUM(CASE WHEN status = 'failed' AND attempts >= 3 THEN 1 ELSE 0 END) as failed,
                 AVG(CASE WHEN quality_score IS NOT NULL THEN quality_score ELSE 0 END) as avg_quality
             FROM tasks
-        """)
-
-        row = cur.fetchone()
-        conn.close()
+        """)[0]
 
         return {
             'total': row[0] or 0,
@@ -1197,21 +1564,39 @@ class DatabaseManager:
             'avg_quality': row[4] or 0
         }
 
+    def get_cached_synthesis(self, fingerprint: str) -> Optional[Tuple[str, float]]:
+        """
+        Look up notes previously synthesized for a transcript fingerprint.
+
+        Returns:
+            Tuple of (notes_path, quality_score), or None on cache miss
+        """
+        rows = self._query(
+            "SELECT notes_path, quality_score FROM synthesis_cache WHERE fingerprint = ?",
+            (fingerprint,)
+        )
+
+        return (rows[0][0], rows[0][1]) if rows else None
+
+    def cache_synthesis(self, fingerprint: str, notes_path: str, quality_score: float):
+        """Record synthesized notes so identical transcripts can reuse them"""
+        with self._lock:
+            self.conn.execute("""
+                INSERT OR REPLACE INTO synthesis_cache (fingerprint, notes_path, quality_score)
+                VALUES (?, ?, ?)
+            """, (fingerprint, notes_path, quality_score))
+
     def list_failed_tasks(self):
         """List all failed tasks with details"""
-        conn = sqlite3.connect(self.db_path)
-        cur = conn.cursor()
+        self.flush_updates()
 
-        cur.execute("""
+        rows = self._query("""
             SELECT lecture_name, srt_path, attempts, error_message
             FROM tasks
             WHERE status = 'failed'
             ORDER BY lecture_name
         """)
 
-        rows = cur.fetchall()
-        conn.close()
-
         if not rows:
             print("[INFO] No failed tasks found")
             return
@@ -1229,47 +1614,159 @@ class DatabaseManager:
 # File Processing
 # ==============================================================================
 
+# English prose averages roughly 4 tokens per 3 words
+TOKENS_PER_WORD_NUM, TOKENS_PER_WORD_DEN = 4, 3
+
+# Output notes live next to the transcript: <stem>_KevinTheAntagonizer_Notes.md
+NOTES_SUFFIX = "_KevinTheAntagonizer_Notes.md"
+NOTES_WRITE_BUFFER = 1 << 20  # 1 MiB - large notes go out in one write()
+
+
+def notes_path_for(srt_path: str) -> str:
+    """Return the notes file path for an SRT path (plain string ops, no Path objects)"""
+    return os.path.splitext(srt_path)[0] + NOTES_SUFFIX
+
+
+# SRT filters, compiled once and run over raw bytes in the C regex engine:
+# cue index lines (digits only, maybe behind a UTF-8 BOM) and timestamp
+# lines (anything containing '-->'). Bytes \d matches ASCII digits only;
+# SRT cue numbers are ASCII, but a file numbered in e.g. full-width or
+# Arabic-Indic digits keeps those lines (str.isdigit() used to drop them).
+# Covered by tests/test_srt_cleaning.py.
+_SRT_STRIP_RE = re.compile(rb'(?m)^(?:\xef\xbb\xbf)?[ \t]*\d+\s*$|^.*-->.*$')
+# Same filters for files with bare CR line breaks (classic Mac), which
+# (?m)^/$ don't see as lines. The lookarounds make it ~4x slower, so it
+# only runs on chunks where _BARE_CR_RE finds such a break.
+_SRT_STRIP_CR_RE = re.compile(
+    rb'(?<![^\r\n])(?:(?:\xef\xbb\xbf)?[ \t]*\d+[ \t]*(?![^\r\n])|[^\r\n]*-->[^\r\n]*)'
+)
+_BARE_CR_RE = re.compile(rb'\r(?!\n)')
+_LINE_BREAK_RE = re.compile(rb'\r\n|[\r\n]')
+_WHITESPACE_RE = re.compile(rb'\s+')
+_UTF8_BOM = b'\xef\xbb\xbf'
+
+# SRT bytes cleaned per step, cut at a line break. Typical lectures fit in
+# one step; with max_chars, huge files stop a step past the limit.
+SRT_CLEAN_CHUNK_BYTES = 256 * 1024
+
+# Everything except letters and digits - ignored when fingerprinting
+_FINGERPRINT_STRIP_RE = re.compile(r'[\W_]+')
+
+# BLAKE3 (SIMD, multi-GB/s) when the optional package is installed,
+# otherwise the stdlib's BLAKE2b - both far faster than SHA-256
+try:
+    from blake3 import blake3 as _fingerprint_hash
+except ImportError:
+    _fingerprint_hash = hashlib.blake2b
+
+
+def transcript_fingerprint(transcript: str) -> str:
+    """
+    Fingerprint a cleaned transcript for the synthesis cache.
+
+    Case, punctuation and whitespace are normalized away first, so re-uploads
+    that differ only in formatting or subtitle timing share a fingerprint.
+    """
+    normalized = _FINGERPRINT_STRIP_RE.sub(' ', transcript.lower()).strip()
+    return _fingerprint_hash(normalized.encode('utf-8')).hexdigest()
+
+
 class FileProcessor:
     """Handles file operations and content cleaning"""
 
     @staticmethod
     def clean_srt_content(srt_path: str) -> Optional[str]:
-        """Clean SRT file content by removing timestamps"""
-        try:
-            with open(srt_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-
-            lines = []
-            for line in content.split('\n'):
-                line = line.strip()
-                # Skip line numbers and timestamps
-                if line and not line.isdigit() and '-->' not in line:
-                    lines.append(line)
+        """Clean SRT file content by removing cue numbers and timestamps"""
+        return FileProcessor.clean_srt_with_tokens(srt_path)[0]
 
-            return ' '.join(lines)
+    @staticmethod
+    def clean_srt_with_tokens(srt_path: str, max_chars: Optional[int] = None) -> Tuple[Optional[str], int]:
+        """
+        Clean SRT file content and estimate its token count in the same pass
+
+        The whitespace-collapse substitution already visits every word gap,
+        so its replacement count gives the word count for free.
+        With max_chars, cleaning stops once the text is longer than
+        max_chars; the partial result is returned so callers still see it
+        as oversize.
+        Returns: (cleaned_text or None on error, approx_tokens)
+        """
+        try:
+            pieces: List[str] = []
+            length = -1  # Length of ' '.join(pieces)
+            words = 0
+            with open(srt_path, 'rb') as f:
+                try:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    return '', 0  # Empty file - nothing to map
+
+                # Each step copies one chunk out of the page cache, so even
+                # a huge file never sits in memory as a single bytes object
+                with mapped:
+                    # One front-to-back pass: let the kernel read ahead
+                    # (madvise needs Python 3.8+ and isn't available on Windows)
+                    if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)
+
+                    start = 0
+                    while start < len(mapped):
+                        end = start + SRT_CLEAN_CHUNK_BYTES
+                        if end < len(mapped):
+                            # Cut after a line break so no line straddles chunks
+                            match = _LINE_BREAK_RE.search(mapped, end)
+                            end = match.end() if match else len(mapped)
+
+                        chunk = mapped[start:end]
+                        strip_re = _SRT_STRIP_CR_RE if _BARE_CR_RE.search(chunk) else _SRT_STRIP_RE
+                        stripped = strip_re.sub(b'', chunk)
+                        if start == 0 and stripped.startswith(_UTF8_BOM):
+                            stripped = stripped[len(_UTF8_BOM):]
+                        start = end
+
+                        # Chunks end on a line break, so collapsing each one and
+                        # joining with single spaces matches collapsing the whole
+                        collapsed, gaps = _WHITESPACE_RE.subn(b' ', stripped.strip())
+                        piece = collapsed.decode('utf-8', errors='ignore')
+                        if piece:
+                            pieces.append(piece)
+                            length += len(piece) + 1
+                            words += gaps + 1
+                            if max_chars is not None and length > max_chars:
+                                break
+
+            return ' '.join(pieces), words * TOKENS_PER_WORD_NUM // TOKENS_PER_WORD_DEN
 
         except Exception as e:
             logging.error(f"Failed to read {srt_path}: {e}")
+            return None, 0
+
+    @staticmethod
+    def load_notes(notes_path: str) -> Optional[str]:
+        """Read previously saved notes, or None if missing/unreadable"""
+        try:
+            with open(notes_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError as e:
+            logging.warning(f"Cached notes unavailable ({notes_path}): {e}")
             return None
 
     @staticmethod
     def save_notes(content: str, srt_path: str) -> Optional[str]:
         """Save synthesized notes to markdown file (never overwrites existing)"""
-        srt_path = Path(srt_path)
-        output_path = srt_path.parent / f"{srt_path.stem}_KevinTheAntagonizer_Notes.md"
-
-        # Never overwrite existing notes
-        if output_path.exists():
-            logging.warning(f"Notes already exist, skipping: {output_path.name}")
-            return str(output_path)  # Return path but don't overwrite
+        output_path = notes_path_for(srt_path)
 
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
+            # 'x' mode fails if the file exists - never overwrite existing notes
+            with open(output_path, 'x', encoding='utf-8', buffering=NOTES_WRITE_BUFFER) as f:
                 f.write(content)
 
-            logging.info(f"Saved notes to {output_path.name}")
-            return str(output_path)
+            logging.info(f"Saved notes to {os.path.basename(output_path)}")
+            return output_path
 
+        except FileExistsError:
+            logging.warning(f"Notes already exist, skipping: {os.path.basename(output_path)}")
+            return output_path  # Return path but don't overwrite
         except Exception as e:
             logging.error(f"Failed to save notes: {e}")
             return None
@@ -1278,8 +1775,47 @@ class FileProcessor:
 # Quality Control
 # ==============================================================================
 
+def _contains_any(text: str, markers: Tuple[str, ...]) -> bool:
+    """True if any marker occurs in text (stops at the first hit)"""
+    return any(marker in text for marker in markers)
+
+
 class QualityController:
-    """Ensures synthesis quality meets standards"""
+    """
+    Ensures synthesis quality meets standards
+
+    Marker lists are class-level tuples built once. check_synthesis lowercases
+    the notes once and scans them with plain substring tests; precompiled
+    case-insensitive regexes were tried and measured ~20x slower.
+    """
+
+    # Lecture names that imply code blocks are expected
+    TECH_KEYWORDS = ('code', 'spring', 'java', 'programming')
+
+    # Kevin's voice/personality
+    KEVIN_PHRASES = ('production', 'real-world', 'actually', 'here\'s the thing',
+                     'gotcha', 'reality', 'battle-tested', 'in the trenches')
+
+    # Tiered automation detection: critical (auto-fail) vs minor (warning only)
+    CRITICAL_MARKERS = (
+        'i have processed',
+        'i generated these',
+        'this script',
+        'as an ai',
+        'i cannot access',
+        'files have been processed',
+        'batch processing completed',
+        'script completed'
+    )
+
+    MINOR_MARKERS = (
+        'automated',  # Could be "automated testing"
+        'processed',  # Could be "processed data"
+        'generated'   # Could be "generated code"
+    )
+
+    # Bullet/numbered list prefixes (plain substring scans beat a regex here)
+    LIST_MARKERS = ('- ', '* ', '1. ', '• ')
 
     @staticmethod
     def check_synthesis(content: str, lecture_name: str) -> Tuple[float, List[str]]:
@@ -1291,20 +1827,24 @@ class QualityController:
         checks_passed = 0
         total_checks = 7
 
+        # Lowercase once and share across the marker scans; one copy plus
+        # substring searches is far cheaper than case-insensitive regexes
+        content_lower = content.lower()
+
         # Length check
         if len(content) >= Config.MIN_QUALITY_LENGTH:
             checks_passed += 1
         else:
             issues.append(f"Too short ({len(content)} chars, min {Config.MIN_QUALITY_LENGTH})")
 
-        # Structure check - headers
-        if '##' in content or '###' in content:
+        # Structure check - headers ('###' always contains '##')
+        if '##' in content:
             checks_passed += 1
         else:
             issues.append("Missing section headers")
 
         # Code blocks (for technical content)
-        if any(tech in lecture_name.lower() for tech in ['code', 'spring', 'java', 'programming']):
+        if _contains_any(lecture_name.lower(), QualityController.TECH_KEYWORDS):
             if '```' in content:
                 checks_passed += 1
             else:
@@ -1313,9 +1853,7 @@ class QualityController:
             checks_passed += 1  # Not applicable
 
         # Kevin's voice/personality
-        kevin_phrases = ['production', 'real-world', 'actually', 'here\'s the thing',
-                        'gotcha', 'reality', 'battle-tested', 'in the trenches']
-        if any(phrase in content.lower() for phrase in kevin_phrases):
+        if _contains_any(content_lower, QualityController.KEVIN_PHRASES):
             checks_passed += 1
         else:
             issues.append("Missing Kevin's personality/voice")
@@ -1323,44 +1861,23 @@ class QualityController:
         # CRITICAL: Automation detection - MODIFIED for severity levels (Nov 2024)
         # Previous version auto-failed on any automation word, causing 48% failure rate
         # Now uses tiered approach: critical (auto-fail) vs minor (warning only)
-
-        # Tiered approach: Critical vs Minor issues
-        critical_markers = [
-            'i have processed',
-            'i generated these',
-            'this script',
-            'as an ai',
-            'i cannot access',
-            'files have been processed',
-            'batch processing completed',
-            'script completed'
-        ]
-
-        minor_markers = [
-            'automated',  # Could be "automated testing"
-            'processed',  # Could be "processed data"
-            'generated'   # Could be "generated code"
-        ]
-
-        content_lower = content.lower()
-
-        if any(marker in content_lower for marker in critical_markers):
+        if _contains_any(content_lower, QualityController.CRITICAL_MARKERS):
             issues.append("CRITICAL: Meta-commentary detected!")
             checks_passed = 0  # Still auto-fail for obvious breaks
-        elif any(marker in content_lower for marker in minor_markers):
+        elif _contains_any(content_lower, QualityController.MINOR_MARKERS):
             issues.append("Minor: Potential automation language")
             # Don't add point, but don't auto-fail
         else:
             checks_passed += 1  # Clean content
 
         # Depth - bullet points or lists
-        if any(marker in content for marker in ['- ', '* ', '1. ', '• ']):
+        if _contains_any(content, QualityController.LIST_MARKERS):
             checks_passed += 1
         else:
             issues.append("Missing detailed lists/points")
 
-        # Emphasis markers
-        if '**' in content or '*' in content or '__' in content:
+        # Emphasis markers ('**' always contains '*')
+        if '*' in content or '__' in content:
             checks_passed += 1
         else:
             issues.append("Missing emphasis/bold text")
@@ -1376,22 +1893,52 @@ class QualityController:
 class NoteSynthesisEngine:
     """Main synthesis engine using Claude Agent SDK"""
 
-    def __init__(self, cli_args: CLIArgs):
+    # Synthesis prompt - CRITICAL: Don't mention files or automation!
+    # Kept as head + transcript + tail so streaming mode never has to build
+    # one giant string around a large transcript. The tail is fully static
+    # and the head only needs the lecture/course filled in per task.
+    PROMPT_HEAD = """You are Kevin Burleigh, a battle-tested Java/Spring Boot architect.
+
+CRITICAL CONSTRAINTS:
+- You are processing ONE SINGLE TRANSCRIPT
+- You CANNOT access the file system
+- You CANNOT write automation scripts
+- You MUST synthesize manually
+
+LECTURE: {lecture}
+COURSE: {course}
+
+TRANSCRIPT TEXT:
+"""
+
+    PROMPT_TAIL = f"""
+
+REQUIREMENTS:
+1. Extract EVERY concept, pattern, technique, anti-pattern, best practice
+2. Add your expert commentary, warnings, and real-world insights
+3. Use clear markdown with ##, ###, code blocks, tables
+4. Include practical examples and gotchas
+5. Minimum {Config.MIN_QUALITY_LENGTH} words of thorough analysis
+6. Be opinionated, detailed, and practical
+
+OUTPUT: Provide ONLY the markdown content. No preambles, no confirmations, just the comprehensive notes."""
+
+    def __init__(self, cli_args: CLIArgs, db: Optional[DatabaseManager] = None):
         self.cli_args = cli_args
+        # Reuse the caller's connection when given one
         # Note: Don't pass reset_db here - database reset already handled in main()
-        self.db = DatabaseManager(cli_args.db_path, reset=False)
+        self.db = db if db is not None else DatabaseManager(cli_args.db_path, reset=False)
         self.file_processor = FileProcessor()
         self.quality_controller = QualityController()
-
-        # Set up logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(cli_args.log_file),
-                logging.StreamHandler()
-            ]
-        )
+        # ClaudeAgentOptions shared by every synthesis call (built on first use)
+        self._agent_options = None
+        # Request budget shared by every worker
+        self.rate_limiter = RateLimiter(cli_args.max_rpm)
+        # fingerprint -> [lock, holders] for transcripts currently being synthesized
+        self._inflight: Dict[str, list] = {}
+
+        # Set up logging (no-op when main() already did)
+        setup_logging(cli_args.log_file)
         self.logger = logging.getLogger(__name__)
 
         # Load system prompt (priority: system_prompt_file > persona_file > default)
@@ -1416,42 +1963,34 @@ class NoteSynthesisEngine:
 
         Uses semaphore to limit concurrent API calls and prevent EBUSY file locking.
         """
+        # REAL Claude Agent SDK imports (deferred until the first synthesis)
+        from claude_agent_sdk import (
+            query,
+            ClaudeAgentOptions,
+            AssistantMessage,
+            TextBlock,
+            CLINotFoundError,
+            ProcessError,
+            CLIJSONDecodeError
+        )
 
-        # Construct the prompt - CRITICAL: Don't mention files or automation!
-        prompt = f"""You are Kevin Burleigh, a battle-tested Java/Spring Boot architect.
-
-CRITICAL CONSTRAINTS:
-- You are processing ONE SINGLE TRANSCRIPT
-- You CANNOT access the file system
-- You CANNOT write automation scripts
-- You MUST synthesize manually
-
-LECTURE: {lecture_name}
-COURSE: {course_name}
-
-TRANSCRIPT TEXT:
-{transcript}
-
-REQUIREMENTS:
-1. Extract EVERY concept, pattern, technique, anti-pattern, best practice
-2. Add your expert commentary, warnings, and real-world insights
-3. Use clear markdown with ##, ###, code blocks, tables
-4. Include practical examples and gotchas
-5. Minimum {Config.MIN_QUALITY_LENGTH} words of thorough analysis
-6. Be opinionated, detailed, and practical
-
-OUTPUT: Provide ONLY the markdown content. No preambles, no confirmations, just the comprehensive notes."""
+        # Construct the prompt - only the lecture/course header varies per task
+        prompt_head = self.PROMPT_HEAD.format_map({'lecture': lecture_name, 'course': course_name})
+        prompt_tail = self.PROMPT_TAIL
 
         try:
-            # Configure agent options with model from CLI
-            options = ClaudeAgentOptions(
-                system_prompt=self.system_prompt,
-                model=self.cli_args.model,  # Use model from CLI
-                allowed_tools=Config.ALLOWED_TOOLS,
-                disallowed_tools=Config.DISALLOWED_TOOLS,
-                permission_mode='default',  # Use default permission handling with allowed/disallowed tools
-                max_turns=1  # Single turn for synthesis
-            )
+            # Configure agent options with model from CLI - identical for every
+            # task, so built once and reused
+            if self._agent_options is None:
+                self._agent_options = ClaudeAgentOptions(
+                    system_prompt=self.system_prompt,
+                    model=self.cli_args.model,  # Use model from CLI
+                    allowed_tools=Config.ALLOWED_TOOLS,
+                    disallowed_tools=Config.DISALLOWED_TOOLS,
+                    permission_mode='default',  # Use default permission handling with allowed/disallowed tools
+                    max_turns=1  # Single turn for synthesis
+                )
+            options = self._agent_options
 
             # Use semaphore to limit concurrent Claude API calls (prevents EBUSY on ~/.claude.json)
             global _claude_semaphore
@@ -1461,40 +2000,50 @@ OUTPUT: Provide ONLY the markdown content. No preambles, no confirmations, just
             # Check if prompt exceeds Windows command line limit (8000 chars for safety)
             # If so, use streaming mode which sends prompt via stdin instead of command line
             WINDOWS_CMD_LIMIT = 7500  # Safety margin below 8191 limit
-            use_streaming = len(prompt) > WINDOWS_CMD_LIMIT
+            prompt_length = len(prompt_head) + len(transcript) + len(prompt_tail)
+            use_streaming = prompt_length > WINDOWS_CMD_LIMIT
 
             max_retries = 3
             for attempt in range(max_retries):
+                # Every attempt, retries included, spends request budget
+                await self.rate_limiter.acquire()
                 async with _claude_semaphore:
                     # Add jitter to stagger file access timing
                     await asyncio.sleep(random.uniform(0.1, 0.5))
 
                     try:
-                        full_response = ""
+                        # Collect text blocks and join once (no quadratic +=)
+                        chunks: List[str] = []
 
                         if use_streaming:
                             # Streaming mode: send prompt via stdin (bypasses command line limit)
+                            # as separate text blocks - the transcript is never copied
+                            # into a combined prompt string
                             async def prompt_generator():
                                 yield {
                                     "type": "user",
-                                    "message": {"role": "user", "content": prompt},
+                                    "message": {"role": "user", "content": [
+                                        {"type": "text", "text": prompt_head},
+                                        {"type": "text", "text": transcript},
+                                        {"type": "text", "text": prompt_tail},
+                                    ]},
                                     "parent_tool_use_id": None,
                                     "session_id": f"synthesis-{id(self)}"
                                 }
 
                             async for message in query(prompt=prompt_generator(), options=options):
                                 if isinstance(message, AssistantMessage):
-                                    for block in message.content:
-                                        if isinstance(block, TextBlock):
-                                            full_response += block.text
+                                    chunks.extend(block.text for block in message.content
+                                                  if isinstance(block, TextBlock))
                         else:
-                            # String mode: standard command line approach
+                            # String mode: standard command line approach (short prompts only)
+                            prompt = prompt_head + transcript + prompt_tail
                             async for message in query(prompt=prompt, options=options):
                                 if isinstance(message, AssistantMessage):
-                                    for block in message.content:
-                                        if isinstance(block, TextBlock):
-                                            full_response += block.text
+                                    chunks.extend(block.text for block in message.content
+                                                  if isinstance(block, TextBlock))
 
+                        full_response = ''.join(chunks)
                         return full_response if full_response else None
 
                     except ProcessError as e:
@@ -1529,42 +2078,139 @@ OUTPUT: Provide ONLY the markdown content. No preambles, no confirmations, just
             self.logger.error(traceback.format_exc())
             return None
 
-    async def process_single_task(self, task: Dict, worker_id: int = 0, worker_pbar: tqdm = None) -> bool:
+    async def reuse_cached_synthesis(self, task: sqlite3.Row, fingerprint: str) -> bool:
+        """
+        Complete a task from the synthesis cache if an identical transcript
+        was already synthesized. Returns True on a cache hit.
+        """
+        cached = await self.db.a_get_cached_synthesis(fingerprint)
+        if not cached:
+            return False
+
+        cached_path, cached_quality = cached
+        notes = self.file_processor.load_notes(cached_path)
+        if not notes:
+            return False
+
+        output_path = self.file_processor.save_notes(notes, task['srt_path'])
+        if not output_path:
+            return False
+
+        await self.db.a_update_task_status(task['id'], 'completed',
+                                          quality_score=cached_quality,
+                                          tokens_used=0)
+        self.logger.info(f"[CACHE] Reused notes for {task['lecture_name']} from {cached_path}")
+        return True
+
+    async def load_transcript(self, task: sqlite3.Row) -> Tuple[Optional[str], int]:
+        """
+        Read and clean a task's transcript in the default executor (keeps the loop free)
+        Returns: (transcript, approx_tokens)
+
+        Large files are read too: how much an .srt shrinks depends on its cue
+        density, so only the cleaned length decides whether it fits. Cleaning
+        stops just past Config.MAX_FILE_SIZE, so an oversize file is rejected
+        without being read to the end.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(self.file_processor.clean_srt_with_tokens,
+                                                        task['srt_path'], max_chars=Config.MAX_FILE_SIZE))
+
+    async def produce_transcripts(self, tasks: List[sqlite3.Row], task_queue: asyncio.Queue,
+                                  num_workers: int):
+        """
+        Producer stage: clean transcripts off-loop and queue (task, transcript)
+        pairs, so disk reads overlap with in-flight Claude calls. The bounded
+        queue keeps the producer at most a few transcripts ahead of workers.
+        Ends with one None sentinel per worker so idle workers block on get()
+        instead of polling. No sentinels are sent when cancelled: that only
+        happens once the workers are done, and a full queue would never drain.
+        """
+        cancelled = False
+        try:
+            for task in tasks:
+                if _shutdown_event is not None and _shutdown_event.is_set():
+                    break
+                transcript, approx_tokens = await self.load_transcript(task)
+                await task_queue.put((task, transcript, approx_tokens))
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            if not cancelled:
+                for _ in range(num_workers):
+                    await task_queue.put(None)
+
+    async def process_single_task(self, task: sqlite3.Row, transcript: Optional[str], approx_tokens: int,
+                                  worker_id: int = 0, worker_pbar: tqdm = None) -> bool:
         """
-        Process a single synthesis task
+        Process a single synthesis task from its cleaned transcript
         Returns True if successful
         """
         task_id = task['id']
-        srt_path = task['srt_path']
         lecture_name = task['lecture_name']
-        course_name = task['course_name']
 
         # Update worker progress bar description (safe for Windows)
         safe_pbar_set_description(worker_pbar, f"Worker{worker_id:02d}: {lecture_name[:30]}")
 
         self.logger.info(f"Worker{worker_id:02d} processing [{task_id}]: {lecture_name}")
 
-        # Clean the transcript
-        transcript = self.file_processor.clean_srt_content(srt_path)
-
         if not transcript:
-            self.db.update_task_status(task_id, 'failed',
-                                      error_message="Failed to read SRT file")
+            await self.db.a_update_task_status(task_id, 'failed',
+                                              error_message="Failed to read SRT file")
             return False
 
         # Check size
         if len(transcript) > Config.MAX_FILE_SIZE:
             self.logger.warning(f"File too large: {lecture_name} ({len(transcript)} chars)")
-            self.db.update_task_status(task_id, 'failed',
-                                      error_message=f"Too large ({len(transcript)} chars)")
+            await self.db.a_update_task_status(task_id, 'failed',
+                                              error_message=f"Too large ({len(transcript)} chars)")
             return False
 
+        # Identical transcripts on other workers wait for the first one, then
+        # pick up its notes from the synthesis cache
+        fingerprint = transcript_fingerprint(transcript)
+        async with self.synthesis_slot(fingerprint):
+            return await self.synthesize_task(task, transcript, approx_tokens, fingerprint,
+                                              worker_id, worker_pbar)
+
+    @contextlib.asynccontextmanager
+    async def synthesis_slot(self, fingerprint: str):
+        """Serialize tasks whose transcripts share a fingerprint"""
+        entry = self._inflight.get(fingerprint)
+        if entry is None:
+            entry = self._inflight[fingerprint] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._inflight[fingerprint]
+
+    async def synthesize_task(self, task: sqlite3.Row, transcript: str, approx_tokens: int, fingerprint: str,
+                              worker_id: int = 0, worker_pbar: tqdm = None) -> bool:
+        """
+        Synthesize, check and save notes for one transcript
+        Returns True if successful
+        """
+        task_id = task['id']
+        srt_path = task['srt_path']
+        lecture_name = task['lecture_name']
+        course_name = task['course_name']
+
+        # Reuse notes from an identical transcript instead of calling Claude again
+        if await self.reuse_cached_synthesis(task, fingerprint):
+            safe_pbar_update(worker_pbar, 1)
+            return True
+
         # Synthesize using SDK
         synthesized = await self.synthesize_with_sdk(transcript, lecture_name, course_name)
 
         if not synthesized:
-            self.db.update_task_status(task_id, 'failed',
-                                      error_message="Synthesis failed")
+            await self.db.a_update_task_status(task_id, 'failed',
+                                              error_message="Synthesis failed")
             return False
 
         # Quality check
@@ -1572,23 +2218,24 @@ OUTPUT: Provide ONLY the markdown content. No preambles, no confirmations, just
 
         if quality_score < Config.MIN_QUALITY_SCORE:
             self.logger.warning(f"Quality check failed for {lecture_name}: {issues}")
-            self.db.update_task_status(task_id, 'failed',
-                                      error_message=f"Quality issues: {', '.join(issues)}",
-                                      quality_score=quality_score)
+            await self.db.a_update_task_status(task_id, 'failed',
+                                              error_message=f"Quality issues: {', '.join(issues)}",
+                                              quality_score=quality_score)
             return False
 
         # Save notes
         output_path = self.file_processor.save_notes(synthesized, srt_path)
 
         if not output_path:
-            self.db.update_task_status(task_id, 'failed',
-                                      error_message="Failed to save notes")
+            await self.db.a_update_task_status(task_id, 'failed',
+                                              error_message="Failed to save notes")
             return False
 
         # Mark as complete
-        self.db.update_task_status(task_id, 'completed',
-                                  quality_score=quality_score,
-                                  tokens_used=len(transcript) // 4)  # Rough estimate
+        await self.db.a_update_task_status(task_id, 'completed',
+                                          quality_score=quality_score,
+                                          tokens_used=approx_tokens)  # Word-count estimate
+        await self.db.a_cache_synthesis(fingerprint, output_path, quality_score)
 
         # Update worker progress bar if provided (safe for Windows)
         safe_pbar_update(worker_pbar, 1)
@@ -1597,12 +2244,11 @@ OUTPUT: Provide ONLY the markdown content. No preambles, no confirmations, just
         return True
 
     async def worker_process_tasks(self, worker_id: int, task_queue: asyncio.Queue,
-                                   worker_pbar: tqdm, main_pbar: tqdm) -> int:
+                                   worker_pbar: tqdm, progress: Dict[str, int]) -> int:
         """
-        Worker process that handles tasks from a queue
+        Worker process that handles (task, transcript) pairs from a queue
         """
         success_count = 0
-        tasks_processed = 0
 
         while True:
             # Check for graceful shutdown
@@ -1611,33 +2257,26 @@ OUTPUT: Provide ONLY the markdown content. No preambles, no confirmations, just
                 self.logger.info(f"Worker{worker_id:02d} received shutdown signal")
                 break
 
-            try:
-                # Get task from queue (with timeout to check for completion)
-                task = await asyncio.wait_for(task_queue.get(), timeout=1.0)
-
-                tasks_processed += 1
-                # Update worker bar to show current task (safe for Windows)
-                safe_pbar_set_description(worker_pbar, f"Worker{worker_id:02d}: Task {tasks_processed}/{self.cli_args.batch_size}")
+            # Wait for the next task; None means the producer has finished
+            item = await task_queue.get()
+            if item is None:
+                task_queue.task_done()
+                break
 
-                # Process the task
-                result = await self.process_single_task(task, worker_id, worker_pbar)
+            try:
+                # Process the task (it sets the worker bar description once)
+                task, transcript, approx_tokens = item
+                result = await self.process_single_task(task, transcript, approx_tokens, worker_id, worker_pbar)
 
                 if result:
                     success_count += 1
-                    safe_pbar_update(main_pbar, 1)  # Update main progress bar (safe for Windows)
-
-                # Mark task as done
-                task_queue.task_done()
-
-                # Small delay between files to avoid overwhelming API
-                await asyncio.sleep(0.5)
+                    progress['done'] += 1  # Main bar is repainted by track_progress
 
-            except asyncio.TimeoutError:
-                # No more tasks available
-                if task_queue.empty():
-                    break
             except Exception as e:
                 self.logger.error(f"Worker{worker_id:02d} error: {e}")
+            finally:
+                # Mark task as done
+                task_queue.task_done()
 
         safe_pbar_set_description(worker_pbar, f"Worker{worker_id:02d}: Complete ({success_count} files)")
         return success_count
@@ -1647,30 +2286,24 @@ OUTPUT: Provide ONLY the markdown content. No preambles, no confirmations, just
         Process all pending tasks using true parallel workers
         Returns total number of successful tasks
         """
-        # Get all pending tasks for workers
-        all_tasks = []
+        # Get one round of pending tasks for all workers
         batch_size_total = self.cli_args.batch_size * self.cli_args.workers
-
-        while True:
-            batch = self.db.get_pending_tasks(batch_size_total, self.cli_args.retry_failed)
-            if not batch:
-                break
-            all_tasks.extend(batch)
-            # Process in chunks to avoid memory issues
-            if len(all_tasks) >= batch_size_total:
-                break
+        all_tasks = await self.db.a_get_pending_tasks(batch_size_total, self.cli_args.retry_failed)
 
         if not all_tasks:
             self.logger.info("No pending tasks")
             return 0
 
+        from tqdm import tqdm
+
         total_tasks = len(all_tasks)
-        self.logger.info(f"Processing {total_tasks} files with {self.cli_args.workers} workers...")
+        # Claude calls are network-bound coroutines on this loop, bounded by
+        # _claude_semaphore - never start more workers than there is work for
+        num_workers = min(self.cli_args.workers, total_tasks)
+        self.logger.info(f"Processing {total_tasks} files with {num_workers} workers...")
 
-        # Create task queue
-        task_queue = asyncio.Queue()
-        for task in all_tasks:
-            await task_queue.put(task)
+        # Bounded queue fed by the transcript producer (started with the workers)
+        task_queue = asyncio.Queue(maxsize=TRANSCRIPT_QUEUE_DEPTH_PER_WORKER * num_workers)
 
         # Create progress bars for each worker plus main progress
         # Position 0 is for main progress, 1+ for workers
@@ -1678,32 +2311,44 @@ OUTPUT: Provide ONLY the markdown content. No preambles, no confirmations, just
 
         # Main progress bar at top
         main_pbar = tqdm(total=total_tasks, desc="Overall Progress",
-                        position=0, leave=True,
+                        position=0, leave=True, mininterval=0.5,
                         bar_format='{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]',
                         ncols=100)
         _active_progress_bars.append(main_pbar)
 
         # Create worker progress bars
-        for i in range(self.cli_args.workers):
+        for i in range(num_workers):
             worker_pbar = tqdm(total=self.cli_args.batch_size,
                              desc=f"Worker{i+1:02d}: Starting",
-                             position=i+1, leave=False,
+                             position=i+1, leave=False, mininterval=0.5,
                              bar_format='{desc: <30} {bar}| {n_fmt}/{total_fmt}',
                              ncols=100)
             worker_pbars.append(worker_pbar)
             _active_progress_bars.append(worker_pbar)
 
-        # Create worker tasks
+        # Completion counter shared by workers, repainted on a timer
+        progress = {'done': 0}
+        progress_task = asyncio.create_task(track_progress(main_pbar, progress))
+
+        # Start the producer, then the worker tasks
+        producer = asyncio.create_task(
+            self.produce_transcripts(all_tasks, task_queue, num_workers)
+        )
         worker_tasks = []
-        for i in range(self.cli_args.workers):
+        for i in range(num_workers):
             worker_task = asyncio.create_task(
-                self.worker_process_tasks(i+1, task_queue, worker_pbars[i], main_pbar)
+                self.worker_process_tasks(i+1, task_queue, worker_pbars[i], progress)
             )
             worker_tasks.append(worker_task)
 
         # Wait for all workers to complete
         results = await asyncio.gather(*worker_tasks)
 
+        # Workers may stop early on shutdown while the producer waits on a full queue
+        producer.cancel()
+        progress_task.cancel()
+        await asyncio.gather(producer, progress_task, return_exceptions=True)
+
         # Close all progress bars properly and remove from tracking (safe for Windows)
         for pbar in worker_pbars:
             safe_pbar_close(pbar)
@@ -1714,7 +2359,7 @@ OUTPUT: Provide ONLY the markdown content. No preambles, no confirmations, just
             _active_progress_bars.remove(main_pbar)
 
         # Clear the progress bar area
-        print("\n" * (self.cli_args.workers + 2))
+        print("\n" * (num_workers + 2))
 
         total_success = sum(results)
         self.logger.info(f"All workers complete: {total_success}/{total_tasks} successful")
@@ -1731,7 +2376,7 @@ OUTPUT: Provide ONLY the markdown content. No preambles, no confirmations, just
             return await self.process_all_tasks()
 
         # Otherwise, use simple sequential processing for single worker
-        tasks = self.db.get_pending_tasks(
+        tasks = await self.db.a_get_pending_tasks(
             self.cli_args.batch_size,
             self.cli_args.retry_failed
         )
@@ -1742,9 +2387,11 @@ OUTPUT: Provide ONLY the markdown content. No preambles, no confirmations, just
 
         self.logger.info(f"Processing batch of {len(tasks)} files...")
 
+        from tqdm import tqdm
+
         success_count = 0
         # Create a simple progress bar for single worker
-        with tqdm(total=len(tasks), desc="Processing", leave=True,
+        with tqdm(total=len(tasks), desc="Processing", leave=True, mininterval=0.5,
                   bar_format='{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt}') as pbar:
             for task in tasks:
                 # Check for graceful shutdown
@@ -1752,13 +2399,11 @@ OUTPUT: Provide ONLY the markdown content. No preambles, no confirmations, just
                     self.logger.info("Received shutdown signal, stopping after current file")
                     break
 
-                if await self.process_single_task(task, worker_id=1):
+                transcript, approx_tokens = await self.load_transcript(task)
+                if await self.process_single_task(task, transcript, approx_tokens, worker_id=1):
                     success_count += 1
                 safe_pbar_update(pbar, 1)  # Safe for Windows
 
-                # Brief pause between API calls to avoid rate limiting
-                await asyncio.sleep(1)
-
         self.logger.info(f"Batch complete: {success_count}/{len(tasks)} successful")
         return success_count
 
@@ -1766,6 +2411,46 @@ OUTPUT: Provide ONLY the markdown content. No preambles, no confirmations, just
 # File Inventory
 # ==============================================================================
 
+def iter_srt(root: Path, recursive: bool) -> Iterable[Tuple[str, int, bool]]:
+    """
+    Yield (path, size_bytes, has_notes) for every .srt file under root
+
+    Walks with os.scandir and a manual stack; DirEntry caches the file type
+    from the directory listing, so only matching files cost a stat call.
+    Existing notes are collected from the same listing, so has_notes needs
+    no extra stat per transcript.
+
+    Matches what Path.rglob("*.srt") found: symlinked files are included,
+    symlinked directories are not descended into, and names compare with
+    os.path.normcase, so "Lecture.SRT" matches on Windows.
+    """
+    srt_suffix = os.path.normcase('.srt')
+    notes_suffix = os.path.normcase(NOTES_SUFFIX)
+    stack = [str(root)]
+    while stack:
+        srts: List[Tuple[str, str, int]] = []
+        notes_names = set()
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    name = os.path.normcase(entry.name)
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(entry.path)
+                    elif name.endswith(srt_suffix) and entry.is_file():
+                        srts.append((entry.path, name, entry.stat().st_size))
+                    elif name.endswith(notes_suffix):
+                        notes_names.add(name)
+        except OSError as e:
+            logging.getLogger(__name__).warning(f"Cannot scan directory: {e}")
+
+        for path, name, size in srts:
+            yield path, size, name[:-len(srt_suffix)] + notes_suffix in notes_names
+
+INVENTORY_FLUSH_SIZE = 1000  # Rows per insert transaction during inventory
+INVENTORY_MAX_WALKERS = 8    # Scan folders walked concurrently
+
+
 def inventory_files(cli_args: CLIArgs, db: DatabaseManager) -> int:
     """Inventory all files that need processing using batch inserts for performance"""
 
@@ -1774,50 +2459,48 @@ def inventory_files(cli_args: CLIArgs, db: DatabaseManager) -> int:
 
     added_count = 0
     skipped_count = 0
-    BATCH_SIZE = 1000  # Insert 1000 files at a time for optimal performance
-
-    for scan_folder in cli_args.scan_folders:
-        # Find all SRT files based on recursive flag
-        if cli_args.recursive:
-            srt_files = list(scan_folder.rglob("*.srt"))
-        else:
-            srt_files = list(scan_folder.glob("*.srt"))
-
-        logger.info(f"Found {len(srt_files)} .srt files in {scan_folder}")
-
-        # Collect tasks for batch insertion
-        batch_tasks: List[Tuple[str, str, str, int]] = []
-
-        for idx, srt_file in enumerate(srt_files):
-            # Log progress every 500 files (less frequent since we're faster now)
-            if idx % 500 == 0:
-                logger.info(f"Scanning file {idx+1}/{len(srt_files)}: {srt_file.name}")
 
-            # Check if notes already exist
-            notes_path = srt_file.parent / f"{srt_file.stem}_KevinTheAntagonizer_Notes.md"
-
-            if notes_path.exists():
-                skipped_count += 1
-                continue
-
-            # Collect task info for batch insert
-            course_name = srt_file.parent.name
-            lecture_name = srt_file.stem
-            file_size_kb = srt_file.stat().st_size // 1024
-            batch_tasks.append((str(srt_file), course_name, lecture_name, file_size_kb))
-
-            # Insert batch when we reach BATCH_SIZE
-            if len(batch_tasks) >= BATCH_SIZE:
-                batch_added = db.add_tasks_batch(batch_tasks)
-                added_count += batch_added
-                logger.info(f"Batch inserted: {batch_added} tasks (total: {added_count})")
-                batch_tasks = []
-
-        # Insert remaining tasks in final batch
-        if batch_tasks:
-            batch_added = db.add_tasks_batch(batch_tasks)
-            added_count += batch_added
-            logger.info(f"Final batch inserted: {batch_added} tasks")
+    # Walk every scan folder on its own thread (scandir releases the GIL) while
+    # this thread inserts results in folder order as each walk completes
+    walkers = max(1, min(len(cli_args.scan_folders), INVENTORY_MAX_WALKERS))
+    with ThreadPoolExecutor(max_workers=walkers, thread_name_prefix='inventory') as pool:
+        walks = pool.map(lambda folder: list(iter_srt(folder, cli_args.recursive)),
+                         cli_args.scan_folders)
+
+        for scan_folder, srt_files in zip(cli_args.scan_folders, walks):
+            logger.info(f"Found {len(srt_files)} .srt files in {scan_folder}")
+
+            # Collect tasks and insert them INVENTORY_FLUSH_SIZE rows per transaction
+            batch_tasks: List[Tuple[str, str, str, int]] = []
+            folder_added = 0
+
+            for idx, (srt_path, size_bytes, has_notes) in enumerate(srt_files):
+                # Log progress every 500 files
+                if idx % 500 == 0:
+                    logger.info(f"Scanning file {idx+1}/{len(srt_files)}: {os.path.basename(srt_path)}")
+
+                # Notes already exist (seen in the same directory listing)
+                if has_notes:
+                    skipped_count += 1
+                    continue
+
+                # Collect task info for batch insert
+                parent, filename = os.path.split(srt_path)
+                course_name = os.path.basename(parent)
+                lecture_name = os.path.splitext(filename)[0]
+                batch_tasks.append((srt_path, course_name, lecture_name, size_bytes // 1024))
+
+                # Bounded transactions: one commit per chunk, and a crash mid-scan
+                # loses at most one chunk
+                if len(batch_tasks) >= INVENTORY_FLUSH_SIZE:
+                    folder_added += db.add_tasks_batch(batch_tasks)
+                    batch_tasks = []
+
+            if batch_tasks:
+                folder_added += db.add_tasks_batch(batch_tasks)
+            if folder_added:
+                added_count += folder_added
+                logger.info(f"Batch inserted: {folder_added} tasks from {scan_folder}")
 
     logger.info(f"Inventory complete: {added_count} new files, {skipped_count} already processed")
     return added_count
@@ -1923,19 +2606,24 @@ async def main():
 
     # Set up logging
     logger = logging.getLogger(__name__)
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(cli_args.log_file),
-            logging.StreamHandler()
-        ]
-    )
+    setup_logging(cli_args.log_file)
 
     logger.info(f"Starting run {cli_args.run_id}")
 
     # Initialize database
     db = DatabaseManager(cli_args.db_path, cli_args.reset_db)
+    flush_timer = asyncio.create_task(db.flush_periodically())
+
+    try:
+        await run_with_database(cli_args, db, logger)
+    finally:
+        flush_timer.cancel()
+        await asyncio.gather(flush_timer, return_exceptions=True)
+        db.close()
+
+
+async def run_with_database(cli_args: CLIArgs, db: DatabaseManager, logger: logging.Logger):
+    """Run database commands and synthesis against an open DatabaseManager"""
 
     # Handle database management commands
     if cli_args.stats:
@@ -1993,7 +2681,7 @@ async def main():
     else:
         print(f"[INFO] Single worker processing batches of {cli_args.batch_size} files")
 
-    engine = NoteSynthesisEngine(cli_args)
+    engine = NoteSynthesisEngine(cli_args, db)
 
     # Get initial statistics
     initial_stats = engine.db.get_statistics()
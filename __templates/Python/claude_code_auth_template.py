@@ -32,9 +32,15 @@ Author: Template generated from KevinTheAntagonizerClaudeCodeNotesMaker
 """
 
 import asyncio
+import functools
+import json
+import os
+import shutil
+import subprocess
 import sys
+import time
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 
 # =============================================================================
 # CLAUDE AGENT SDK IMPORTS
@@ -81,10 +87,182 @@ AVAILABLE_MODELS = {
 DEFAULT_MODEL = "sonnet-4.5"
 
 
+# =============================================================================
+# CLI LOCATION
+# =============================================================================
+
+# Absolute path of the claude-code CLI, resolved once at import
+_cli_path: Optional[str] = shutil.which('claude-code')
+
+
+def get_cli_path() -> Optional[str]:
+    """
+    Return the cached absolute path of the claude-code CLI, or None.
+
+    PATH is searched again only when the CLI was not found earlier or the
+    cached file no longer exists. Spawning by absolute path also spares
+    exec from scanning PATH.
+    """
+    global _cli_path
+    if _cli_path is None or not os.path.exists(_cli_path):
+        _cli_path = shutil.which('claude-code')
+    return _cli_path
+
+
+# =============================================================================
+# CHILD PROCESS WAITING
+# =============================================================================
+
+def use_pidfd_child_watcher() -> None:
+    """
+    Have asyncio learn about CLI subprocess exits through pidfd_open + epoll.
+
+    Call from inside the running event loop, before spawning subprocesses.
+    Only applies to Linux on Python 3.9-3.11 (kernel 5.3+): 3.12+ already
+    uses pidfd by default, and child watchers are deprecated there. The
+    3.9-3.11 default starts one waitpid() thread per child instead.
+    """
+    if not sys.platform.startswith('linux') or not (3, 9) <= sys.version_info < (3, 12):
+        return
+    try:
+        os.close(os.pidfd_open(os.getpid()))  # Probe kernel support
+    except (AttributeError, OSError):
+        return
+    watcher = asyncio.PidfdChildWatcher()
+    watcher.attach_loop(asyncio.get_running_loop())
+    asyncio.set_child_watcher(watcher)
+
+
+# =============================================================================
+# LOGIN CACHE
+# =============================================================================
+# A successful whoami check is also recorded on disk, so separate runs skip
+# the CLI subprocess while the record is fresh. Only the login identity and
+# an expiry are stored - never credentials. The CLI keeps owning the OAuth
+# token; the SDK always talks to Claude through it.
+
+LOGIN_CACHE_FILE = Path.home() / '.cache' / 'kevin_notes' / 'login.json'
+LOGIN_CACHE_TTL_SECONDS = 3600
+
+
+class LoginCache:
+    """File-backed record of the last successful 'claude-code whoami' check"""
+
+    def __init__(self, path: Path = LOGIN_CACHE_FILE, ttl_s: float = LOGIN_CACHE_TTL_SECONDS):
+        self.path = path
+        self.ttl_s = ttl_s
+
+    def get(self) -> Optional[str]:
+        """Return the cached login identity, or None if missing or expired"""
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if isinstance(data, dict) and time.time() < data.get('expires_at', 0) - 60:
+            return data.get('user', '')
+        return None
+
+    def store(self, user: str) -> None:
+        """Record a successful login check (best effort)"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            tmp_path.write_text(
+                json.dumps({'user': user, 'expires_at': time.time() + self.ttl_s}),
+                encoding='utf-8'
+            )
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    def invalidate(self) -> None:
+        """Drop the record so the next check runs whoami again"""
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+
+login_cache = LoginCache()
+
+
+# =============================================================================
+# VERIFICATION CACHE
+# =============================================================================
+# Successful verifications are reused for a few minutes, so repeated checks
+# in a batch skip the PATH lookup and the whoami subprocess. Failures are
+# never cached; call invalidate_auth_cache() after logging out or switching
+# accounts to force a fresh check.
+
+AUTH_CACHE_TTL_SECONDS = 300
+
+_verify_cache: Dict[tuple, Tuple[float, object]] = {}
+
+
+def _auth_cache_key(func) -> tuple:
+    """Key cached results on the user and environment the CLI would see"""
+    geteuid = getattr(os, 'geteuid', None)  # Not available on Windows
+    return (
+        func.__qualname__,
+        geteuid() if geteuid else None,
+        os.environ.get('PATH'),
+        os.environ.get('HOME'),
+    )
+
+
+def memoize_with_ttl(ttl_s: float):
+    """
+    Cache a no-argument verification function's result for ttl_s seconds.
+
+    Works for both plain and async functions. Only truthy results are
+    cached: a False result or an exception is retried on the next call, so
+    installing or logging in takes effect without invalidate_auth_cache().
+    """
+    def decorator(func):
+        def lookup(key):
+            hit = _verify_cache.get(key)
+            if hit and time.monotonic() - hit[0] < ttl_s:
+                return hit
+            return None
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper():
+                key = _auth_cache_key(func)
+                hit = lookup(key)
+                if hit:
+                    return hit[1]
+                result = await func()
+                if result:
+                    _verify_cache[key] = (time.monotonic(), result)
+                return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper():
+            key = _auth_cache_key(func)
+            hit = lookup(key)
+            if hit:
+                return hit[1]
+            result = func()
+            if result:
+                _verify_cache[key] = (time.monotonic(), result)
+            return result
+        return wrapper
+    return decorator
+
+
+def invalidate_auth_cache() -> None:
+    """Forget cached verification results (e.g. after claude-code logout)"""
+    _verify_cache.clear()
+    login_cache.invalidate()
+
+
 # =============================================================================
 # AUTHENTICATION VERIFICATION
 # =============================================================================
 
+@memoize_with_ttl(AUTH_CACHE_TTL_SECONDS)
 def verify_cli_installation() -> bool:
     """
     Verify Claude Code CLI is installed and accessible.
@@ -92,9 +270,7 @@ def verify_cli_installation() -> bool:
     Returns:
         bool: True if CLI is available, False otherwise
     """
-    import shutil
-
-    cli_path = shutil.which('claude-code')
+    cli_path = get_cli_path()
     if cli_path:
         print(f"[OK] Claude Code CLI found at: {cli_path}")
         return True
@@ -104,31 +280,87 @@ def verify_cli_installation() -> bool:
         return False
 
 
-def verify_cli_login() -> bool:
+@memoize_with_ttl(AUTH_CACHE_TTL_SECONDS)
+async def verify_cli_login_async() -> bool:
     """
     Verify user is logged into Claude Code CLI.
 
+    Runs 'claude-code whoami' as an asyncio subprocess, so the event loop
+    keeps serving other work while the CLI starts up.
+
     Returns:
         bool: True if logged in, False otherwise
     """
-    import subprocess
+    user = login_cache.get()
+    if user is not None:
+        print(f"[OK] Logged in as: {user} (cached)")
+        return True
+
+    cli_path = get_cli_path()
+    if not cli_path:
+        print("[ERROR] Claude Code CLI not found")
+        return False
 
     try:
-        result = subprocess.run(
-            ['claude-code', 'whoami'],
-            capture_output=True,
-            text=True,
-            timeout=10
+        proc = await asyncio.create_subprocess_exec(
+            cli_path, 'whoami',
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
         )
 
-        if result.returncode == 0:
-            print(f"[OK] Logged in as: {result.stdout.strip()}")
+        try:
+            stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=10)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            print("[ERROR] CLI login check timed out")
+            return False
+
+        if proc.returncode == 0:
+            user = stdout.decode(errors='replace').strip()
+            login_cache.store(user)
+            print(f"[OK] Logged in as: {user}")
             return True
         else:
             print("[ERROR] Not logged in to Claude Code CLI!")
             print("Login with: claude-code login")
             return False
 
+    except FileNotFoundError:
+        print("[ERROR] Claude Code CLI not found")
+        return False
+
+
+@memoize_with_ttl(AUTH_CACHE_TTL_SECONDS)
+def verify_cli_login() -> bool:
+    """
+    Blocking version of verify_cli_login_async().
+
+    Runs whoami with subprocess.run, so it works with or without a running
+    event loop. Code that is already async should await
+    verify_cli_login_async() instead, which doesn't block the loop while
+    the CLI starts.
+
+    Returns:
+        bool: True if logged in, False otherwise
+    """
+    user = login_cache.get()
+    if user is not None:
+        print(f"[OK] Logged in as: {user} (cached)")
+        return True
+
+    cli_path = get_cli_path()
+    if not cli_path:
+        print("[ERROR] Claude Code CLI not found")
+        return False
+
+    try:
+        result = subprocess.run(
+            [cli_path, 'whoami'],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
     except subprocess.TimeoutExpired:
         print("[ERROR] CLI login check timed out")
         return False
@@ -136,6 +368,54 @@ def verify_cli_login() -> bool:
         print("[ERROR] Claude Code CLI not found")
         return False
 
+    if result.returncode == 0:
+        user = result.stdout.strip()
+        login_cache.store(user)
+        print(f"[OK] Logged in as: {user}")
+        return True
+    else:
+        print("[ERROR] Not logged in to Claude Code CLI!")
+        print("Login with: claude-code login")
+        return False
+
+
+# =============================================================================
+# AGENT OPTIONS
+# =============================================================================
+
+# Working directory for file operations, resolved once at import
+WORKING_DIR = Path.cwd()
+
+
+@functools.lru_cache(maxsize=128)
+def get_options(
+    model_id: str,
+    system_prompt: Optional[str] = None,
+    allowed_tools: Optional[Tuple[str, ...]] = None,
+    disallowed_tools: Optional[Tuple[str, ...]] = None,
+    cwd: Path = WORKING_DIR
+) -> ClaudeAgentOptions:
+    """
+    Return a shared ClaudeAgentOptions for one configuration.
+
+    Options are built once per distinct argument tuple, so callers that only
+    vary the prompt reuse the same object. Pass tools as tuples (lists are
+    not hashable). The result is shared between calls - treat it as
+    read-only.
+    """
+    kwargs = dict(
+        model=model_id,
+        max_turns=1,  # Single response (no conversation)
+        cwd=cwd
+    )
+    if system_prompt is not None:
+        kwargs['system_prompt'] = system_prompt
+    if allowed_tools is not None or disallowed_tools is not None:
+        kwargs['allowed_tools'] = list(allowed_tools or ())
+        kwargs['disallowed_tools'] = list(disallowed_tools or ())
+        kwargs['permission_mode'] = 'default'  # Respect allowed/disallowed tools
+    return ClaudeAgentOptions(**kwargs)
+
 
 # =============================================================================
 # BASIC QUERY EXAMPLE
@@ -161,23 +441,21 @@ async def simple_query(prompt: str, model: str = DEFAULT_MODEL) -> Optional[str]
 
     # Configure agent options
     # NOTE: No API key! Authentication happens through Claude Code CLI
-    options = ClaudeAgentOptions(
-        model=model_id,
-        max_turns=1,  # Single response (no conversation)
-        cwd=Path.cwd()  # Working directory for file operations
-    )
+    options = get_options(model_id)
 
     try:
         # The query() function is async and yields response chunks
-        full_response = ""
+        chunks: List[str] = []
 
         async for message in query(prompt=prompt, options=options):
             # Extract text from assistant messages
             if isinstance(message, AssistantMessage):
                 for block in message.content:
                     if isinstance(block, TextBlock):
-                        full_response += block.text
+                        chunks.append(block.text)
 
+        # Join once instead of re-copying the growing string on every block
+        full_response = ''.join(chunks)
         return full_response if full_response else None
 
     except CLINotFoundError:
@@ -187,6 +465,9 @@ async def simple_query(prompt: str, model: str = DEFAULT_MODEL) -> Optional[str]
 
     except ProcessError as e:
         print(f"[ERROR] CLI process failed with exit code: {e.exit_code}")
+        if e.exit_code == 1:
+            # Often an expired login - make the next check run whoami again
+            invalidate_auth_cache()
         return None
 
     except CLIJSONDecodeError as e:
@@ -229,25 +510,24 @@ async def query_with_persona(
     model_id = AVAILABLE_MODELS.get(model, AVAILABLE_MODELS[DEFAULT_MODEL])
 
     # Configure with system prompt and tool restrictions
-    options = ClaudeAgentOptions(
+    options = get_options(
+        model_id,
         system_prompt=system_prompt,
-        model=model_id,
-        allowed_tools=allowed_tools or [],
-        disallowed_tools=disallowed_tools or [],
-        permission_mode='default',  # Respect allowed/disallowed tools
-        max_turns=1,
-        cwd=Path.cwd()
+        allowed_tools=tuple(allowed_tools or ()),
+        disallowed_tools=tuple(disallowed_tools or ())
     )
 
     try:
-        full_response = ""
+        chunks: List[str] = []
 
         async for message in query(prompt=prompt, options=options):
             if isinstance(message, AssistantMessage):
                 for block in message.content:
                     if isinstance(block, TextBlock):
-                        full_response += block.text
+                        chunks.append(block.text)
 
+        # Join once instead of re-copying the growing string on every block
+        full_response = ''.join(chunks)
         return full_response if full_response else None
 
     except (CLINotFoundError, ProcessError, CLIJSONDecodeError) as e:
@@ -275,11 +555,7 @@ async def streaming_query(prompt: str, model: str = DEFAULT_MODEL):
 
     model_id = AVAILABLE_MODELS.get(model, AVAILABLE_MODELS[DEFAULT_MODEL])
 
-    options = ClaudeAgentOptions(
-        model=model_id,
-        max_turns=1,
-        cwd=Path.cwd()
-    )
+    options = get_options(model_id)
 
     try:
         async for message in query(prompt=prompt, options=options):
@@ -292,6 +568,39 @@ async def streaming_query(prompt: str, model: str = DEFAULT_MODEL):
         print(f"[ERROR] Streaming failed: {e}")
 
 
+# =============================================================================
+# CONCURRENT BATCH QUERIES
+# =============================================================================
+
+async def batch_query(
+    prompts: List[str],
+    model: str = DEFAULT_MODEL,
+    concurrency: int = 4
+) -> List[Optional[str]]:
+    """
+    Run simple_query() for many prompts concurrently.
+
+    Each query is I/O-bound on the CLI process, so running a few at once
+    gives near-linear speedup. The semaphore caps how many CLI processes
+    are live at the same time (2-8 works well).
+
+    Args:
+        prompts: Prompts to send, one query each
+        model: Model alias from AVAILABLE_MODELS
+        concurrency: Maximum number of queries in flight
+
+    Returns:
+        One response per prompt, in order (None where a query failed)
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(prompt: str) -> Optional[str]:
+        async with semaphore:
+            return await simple_query(prompt, model=model)
+
+    return await asyncio.gather(*[_one(p) for p in prompts])
+
+
 # =============================================================================
 # MAIN EXAMPLE USAGE
 # =============================================================================
@@ -301,6 +610,8 @@ async def main():
     Example usage demonstrating Claude Code CLI authentication.
     """
 
+    use_pidfd_child_watcher()
+
     print("\n" + "="*60)
     print("Claude Code CLI Authentication Demo")
     print("="*60 + "\n")
@@ -315,21 +626,37 @@ async def main():
         print("  3. Run: claude-code login")
         sys.exit(1)
 
-    if not verify_cli_login():
+    if not await verify_cli_login_async():
         print("\nPlease login:")
         print("  Run: claude-code login")
         sys.exit(1)
 
     print()
 
-    # Step 2: Simple query
+    # Steps 2 and 3 don't depend on each other, so both queries run at once
     print("[2/3] Making a simple query...")
+    print("[3/3] Query with custom persona...")
 
-    response = await simple_query(
-        prompt="What is 2 + 2? Reply with just the number.",
-        model="haiku"  # Use cheapest model for demo
+    expert_prompt = """You are a Python expert.
+    When asked about code, provide concise, practical answers.
+    Focus on best practices and real-world usage."""
+
+    response, expert_response = await asyncio.gather(
+        simple_query(
+            prompt="What is 2 + 2? Reply with just the number.",
+            model="haiku"  # Use cheapest model for demo
+        ),
+        query_with_persona(
+            prompt="What's the best way to read a JSON file in Python?",
+            system_prompt=expert_prompt,
+            model="haiku",
+            allowed_tools=["Read"],  # Only allow file reading
+            disallowed_tools=["Write", "Bash"]  # Prevent modifications
+        )
     )
 
+    print()
+
     if response:
         print(f"Response: {response.strip()}")
     else:
@@ -338,23 +665,8 @@ async def main():
 
     print()
 
-    # Step 3: Query with persona
-    print("[3/3] Query with custom persona...")
-
-    expert_prompt = """You are a Python expert.
-    When asked about code, provide concise, practical answers.
-    Focus on best practices and real-world usage."""
-
-    response = await query_with_persona(
-        prompt="What's the best way to read a JSON file in Python?",
-        system_prompt=expert_prompt,
-        model="haiku",
-        allowed_tools=["Read"],  # Only allow file reading
-        disallowed_tools=["Write", "Bash"]  # Prevent modifications
-    )
-
-    if response:
-        print(f"Expert Response:\n{response[:500]}...")  # Truncate for demo
+    if expert_response:
+        print(f"Expert Response:\n{expert_response[:500]}...")  # Truncate for demo
 
     print("\n" + "="*60)
     print("Demo Complete!")
@@ -24,14 +24,14 @@ async def ask_claude(prompt: str) -> str:
         max_turns=1
     )
 
-    response = ""
+    chunks = []
     async for message in query(prompt=prompt, options=options):
         if isinstance(message, AssistantMessage):
             for block in message.content:
                 if isinstance(block, TextBlock):
-                    response += block.text
+                    chunks.append(block.text)
 
-    return response
+    return ''.join(chunks)
 
 
 # Usage
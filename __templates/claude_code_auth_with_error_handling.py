@@ -13,11 +13,15 @@ SETUP:
 """
 
 import asyncio
+import functools
+import json
+import os
 import shutil
 import subprocess
 import sys
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple, Union
 
 from claude_agent_sdk import (
     query,
@@ -31,6 +35,177 @@ from claude_agent_sdk import (
 )
 
 
+# =============================================================================
+# CLI LOCATION
+# =============================================================================
+
+# Absolute path of the claude-code CLI, resolved once at import
+_cli_path: Optional[str] = shutil.which('claude-code')
+
+
+def get_cli_path() -> Optional[str]:
+    """
+    Return the cached absolute path of the claude-code CLI, or None.
+
+    PATH is searched again only when the CLI was not found earlier or the
+    cached file no longer exists. Spawning by absolute path also spares
+    exec from scanning PATH.
+    """
+    global _cli_path
+    if _cli_path is None or not os.path.exists(_cli_path):
+        _cli_path = shutil.which('claude-code')
+    return _cli_path
+
+
+# =============================================================================
+# CHILD PROCESS WAITING
+# =============================================================================
+
+def use_pidfd_child_watcher() -> None:
+    """
+    Have asyncio learn about CLI subprocess exits through pidfd_open + epoll.
+
+    Call from inside the running event loop, before spawning subprocesses.
+    Only applies to Linux on Python 3.9-3.11 (kernel 5.3+): 3.12+ already
+    uses pidfd by default, and child watchers are deprecated there. The
+    3.9-3.11 default starts one waitpid() thread per child instead.
+    """
+    if not sys.platform.startswith('linux') or not (3, 9) <= sys.version_info < (3, 12):
+        return
+    try:
+        os.close(os.pidfd_open(os.getpid()))  # Probe kernel support
+    except (AttributeError, OSError):
+        return
+    watcher = asyncio.PidfdChildWatcher()
+    watcher.attach_loop(asyncio.get_running_loop())
+    asyncio.set_child_watcher(watcher)
+
+
+# =============================================================================
+# LOGIN CACHE
+# =============================================================================
+# A successful whoami check is also recorded on disk, so separate runs skip
+# the CLI subprocess while the record is fresh. Only the login identity and
+# an expiry are stored - never credentials. The CLI keeps owning the OAuth
+# token; the SDK always talks to Claude through it.
+
+LOGIN_CACHE_FILE = Path.home() / '.cache' / 'kevin_notes' / 'login.json'
+LOGIN_CACHE_TTL_SECONDS = 3600
+
+
+class LoginCache:
+    """File-backed record of the last successful 'claude-code whoami' check"""
+
+    def __init__(self, path: Path = LOGIN_CACHE_FILE, ttl_s: float = LOGIN_CACHE_TTL_SECONDS):
+        self.path = path
+        self.ttl_s = ttl_s
+
+    def get(self) -> Optional[str]:
+        """Return the cached login identity, or None if missing or expired"""
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if isinstance(data, dict) and time.time() < data.get('expires_at', 0) - 60:
+            return data.get('user', '')
+        return None
+
+    def store(self, user: str) -> None:
+        """Record a successful login check (best effort)"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            tmp_path.write_text(
+                json.dumps({'user': user, 'expires_at': time.time() + self.ttl_s}),
+                encoding='utf-8'
+            )
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    def invalidate(self) -> None:
+        """Drop the record so the next check runs whoami again"""
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+
+login_cache = LoginCache()
+
+
+# =============================================================================
+# VERIFICATION CACHE
+# =============================================================================
+# Successful verifications are reused for a few minutes, so repeated checks
+# in a batch skip the PATH lookup and the whoami subprocess. Failures are
+# never cached; call invalidate_auth_cache() after logging out or switching
+# accounts to force a fresh check.
+
+AUTH_CACHE_TTL_SECONDS = 300
+
+_verify_cache: Dict[tuple, Tuple[float, object]] = {}
+
+
+def _auth_cache_key(func) -> tuple:
+    """Key cached results on the user and environment the CLI would see"""
+    geteuid = getattr(os, 'geteuid', None)  # Not available on Windows
+    return (
+        func.__qualname__,
+        geteuid() if geteuid else None,
+        os.environ.get('PATH'),
+        os.environ.get('HOME'),
+    )
+
+
+def memoize_with_ttl(ttl_s: float):
+    """
+    Cache a no-argument verification function's result for ttl_s seconds.
+
+    Works for both plain and async functions. Only truthy results are
+    cached: a False result or an exception is retried on the next call, so
+    installing or logging in takes effect without invalidate_auth_cache().
+    """
+    def decorator(func):
+        def lookup(key):
+            hit = _verify_cache.get(key)
+            if hit and time.monotonic() - hit[0] < ttl_s:
+                return hit
+            return None
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper():
+                key = _auth_cache_key(func)
+                hit = lookup(key)
+                if hit:
+                    return hit[1]
+                result = await func()
+                if result:
+                    _verify_cache[key] = (time.monotonic(), result)
+                return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper():
+            key = _auth_cache_key(func)
+            hit = lookup(key)
+            if hit:
+                return hit[1]
+            result = func()
+            if result:
+                _verify_cache[key] = (time.monotonic(), result)
+            return result
+        return wrapper
+    return decorator
+
+
+def invalidate_auth_cache() -> None:
+    """Forget cached verification results (e.g. after claude-code logout)"""
+    _verify_cache.clear()
+    login_cache.invalidate()
+
+
 # =============================================================================
 # ERROR HANDLING UTILITIES
 # =============================================================================
@@ -40,49 +215,163 @@ class ClaudeAuthError(Exception):
     pass
 
 
-def check_prerequisites() -> None:
+CLI_NOT_FOUND_MESSAGE = (
+    "Claude Code CLI not found!\n\n"
+    "Install with:\n"
+    "  npm install -g @anthropic-ai/claude-code\n\n"
+    "Then login:\n"
+    "  claude-code login"
+)
+
+NOT_LOGGED_IN_MESSAGE = (
+    "Not logged in to Claude Code!\n\n"
+    "Login with:\n"
+    "  claude-code login\n\n"
+    "This will open your browser for authentication."
+)
+
+LOGIN_TIMEOUT_MESSAGE = (
+    "Claude Code CLI timed out checking login status.\n"
+    "Try running 'claude-code whoami' manually."
+)
+
+
+@memoize_with_ttl(AUTH_CACHE_TTL_SECONDS)
+async def check_prerequisites_async() -> bool:
     """
-    Verify all prerequisites are met. Raises ClaudeAuthError if not.
+    Verify all prerequisites are met. Returns True, or raises ClaudeAuthError.
 
     Call this at application startup to fail fast with clear messages.
+    The login check runs as an asyncio subprocess, so it does not block
+    the event loop.
     """
 
     # Check 1: Claude Code CLI installed
-    cli_path = shutil.which('claude-code')
+    cli_path = get_cli_path()
     if not cli_path:
-        raise ClaudeAuthError(
-            "Claude Code CLI not found!\n\n"
-            "Install with:\n"
-            "  npm install -g @anthropic-ai/claude-code\n\n"
-            "Then login:\n"
-            "  claude-code login"
+        raise ClaudeAuthError(CLI_NOT_FOUND_MESSAGE)
+
+    # Check 2: User is logged in (a fresh on-disk record skips whoami)
+    if login_cache.get() is not None:
+        return True
+
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            cli_path, 'whoami',
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
         )
+    except FileNotFoundError:
+        raise ClaudeAuthError("Claude Code CLI not found in PATH")
+
+    try:
+        stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=10)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise ClaudeAuthError(LOGIN_TIMEOUT_MESSAGE)
+
+    if proc.returncode != 0:
+        raise ClaudeAuthError(NOT_LOGGED_IN_MESSAGE)
+
+    login_cache.store(stdout.decode(errors='replace').strip())
+    return True
+
+
+@memoize_with_ttl(AUTH_CACHE_TTL_SECONDS)
+def check_prerequisites() -> bool:
+    """
+    Blocking version of check_prerequisites_async(). Returns True, or raises
+    ClaudeAuthError.
+
+    Runs whoami with subprocess.run, so it works with or without a running
+    event loop (scripts, Jupyter, sync code called from async code). Code
+    that is already async should await check_prerequisites_async() instead,
+    which doesn't block the loop while the CLI starts.
+    """
+
+    # Check 1: Claude Code CLI installed
+    cli_path = get_cli_path()
+    if not cli_path:
+        raise ClaudeAuthError(CLI_NOT_FOUND_MESSAGE)
+
+    # Check 2: User is logged in (a fresh on-disk record skips whoami)
+    if login_cache.get() is not None:
+        return True
 
-    # Check 2: User is logged in
     try:
         result = subprocess.run(
-            ['claude-code', 'whoami'],
+            [cli_path, 'whoami'],
             capture_output=True,
             text=True,
             timeout=10
         )
-
-        if result.returncode != 0:
-            raise ClaudeAuthError(
-                "Not logged in to Claude Code!\n\n"
-                "Login with:\n"
-                "  claude-code login\n\n"
-                "This will open your browser for authentication."
-            )
-
     except subprocess.TimeoutExpired:
-        raise ClaudeAuthError(
-            "Claude Code CLI timed out checking login status.\n"
-            "Try running 'claude-code whoami' manually."
-        )
+        raise ClaudeAuthError(LOGIN_TIMEOUT_MESSAGE)
     except FileNotFoundError:
         raise ClaudeAuthError("Claude Code CLI not found in PATH")
 
+    if result.returncode != 0:
+        raise ClaudeAuthError(NOT_LOGGED_IN_MESSAGE)
+
+    login_cache.store(result.stdout.strip())
+    return True
+
+
+# =============================================================================
+# AGENT OPTIONS
+# =============================================================================
+
+# Working directory for file operations, resolved once at import
+WORKING_DIR = Path.cwd()
+
+
+@functools.lru_cache(maxsize=128)
+def get_options(model: str, system_prompt: Optional[str] = None) -> ClaudeAgentOptions:
+    """
+    Return a shared ClaudeAgentOptions for one (model, system_prompt) pair.
+
+    Built once per configuration and reused by every query that only varies
+    the prompt. The result is shared between calls - treat it as read-only.
+    """
+    options = ClaudeAgentOptions(
+        model=model,
+        max_turns=1,
+        cwd=WORKING_DIR
+    )
+
+    if system_prompt:
+        options.system_prompt = system_prompt
+
+    return options
+
+
+# =============================================================================
+# RETRY POLICY
+# =============================================================================
+# How safe_query reacts to each failure: (retryable, backoff, message).
+# backoff=True waits 2**attempt seconds before the next attempt. Lookup walks
+# the exception's MRO, so an unlisted subclass uses its base class's entry.
+
+RETRY_POLICY: Dict[type, Tuple[bool, bool, str]] = {
+    CLINotFoundError: (False, False, "Claude Code CLI not found"),
+    ProcessError: (True, True, "CLI process failed with code {exit_code}"),
+    CLIJSONDecodeError: (True, True, "Failed to parse response: {error}"),
+    asyncio.TimeoutError: (True, False, "Request timed out after {timeout} seconds"),
+    ClaudeSDKError: (True, True, "SDK error: {error}"),
+}
+
+DEFAULT_RETRY_POLICY = (True, True, "Unexpected error: {name}: {error}")
+
+
+def classify_error(error: BaseException) -> Tuple[bool, bool, str]:
+    """Return the (retryable, backoff, message) policy for an exception"""
+    for cls in type(error).__mro__:
+        policy = RETRY_POLICY.get(cls)
+        if policy is not None:
+            return policy
+    return DEFAULT_RETRY_POLICY
+
 
 # =============================================================================
 # QUERY FUNCTION WITH FULL ERROR HANDLING
@@ -112,97 +401,103 @@ async def safe_query(
         ClaudeAuthError: If authentication is not set up
     """
 
-    # Configure options
-    options = ClaudeAgentOptions(
-        model=model,
-        max_turns=1,
-        cwd=Path.cwd()
-    )
-
-    if system_prompt:
-        options.system_prompt = system_prompt
+    # Configure options (shared across calls with the same configuration)
+    options = get_options(model, system_prompt)
 
     last_error = None
 
     for attempt in range(1, max_retries + 1):
         try:
-            full_response = ""
+            chunks: List[str] = []
 
             # Use asyncio.wait_for for timeout
             async def do_query():
-                nonlocal full_response
                 async for message in query(prompt=prompt, options=options):
                     if isinstance(message, AssistantMessage):
                         for block in message.content:
                             if isinstance(block, TextBlock):
-                                full_response += block.text
+                                chunks.append(block.text)
 
             await asyncio.wait_for(do_query(), timeout=timeout_seconds)
 
+            # Join once instead of re-copying the growing string on every block
+            full_response = ''.join(chunks)
+
             if full_response:
                 return full_response
             else:
                 print(f"[WARNING] Empty response on attempt {attempt}/{max_retries}")
 
-        except CLINotFoundError:
-            # This is a setup issue, not transient - don't retry
-            raise ClaudeAuthError(
-                "Claude Code CLI not found!\n"
-                "Install: npm install -g @anthropic-ai/claude-code\n"
-                "Login: claude-code login"
+        except Exception as e:
+            retryable, backoff, message = classify_error(e)
+
+            if not retryable:
+                # This is a setup issue, not transient - don't retry
+                raise ClaudeAuthError(
+                    "Claude Code CLI not found!\n"
+                    "Install: npm install -g @anthropic-ai/claude-code\n"
+                    "Login: claude-code login"
+                )
+
+            last_error = message.format(
+                error=e,
+                name=type(e).__name__,
+                exit_code=getattr(e, 'exit_code', None),
+                timeout=timeout_seconds
             )
+            print(f"[ERROR] {last_error}")
 
-        except ProcessError as e:
-            last_error = e
-            if e.exit_code == 1:
-                # Exit code 1 often means auth issue
-                print(f"[ERROR] CLI process failed (exit code 1)")
+            if isinstance(e, ProcessError) and e.exit_code == 1:
+                # Exit code 1 often means auth issue (could be transient, retry)
                 print("This often means you need to re-login:")
                 print("  claude-code login")
-                # Could be transient, retry
-            else:
-                print(f"[ERROR] CLI process failed with code {e.exit_code}")
+                invalidate_auth_cache()
 
             if attempt < max_retries:
-                wait_time = 2 ** attempt  # Exponential backoff
-                print(f"[RETRY] Waiting {wait_time}s before retry {attempt + 1}...")
-                await asyncio.sleep(wait_time)
+                if backoff:
+                    wait_time = 2 ** attempt  # Exponential backoff
+                    print(f"[RETRY] Waiting {wait_time}s before retry {attempt + 1}...")
+                    await asyncio.sleep(wait_time)
+                else:
+                    print(f"[RETRY] Attempt {attempt + 1}/{max_retries}...")
 
-        except CLIJSONDecodeError as e:
-            last_error = e
-            print(f"[ERROR] Failed to parse response: {e}")
+    # All retries exhausted
+    print(f"[FAILED] All {max_retries} attempts failed. Last error: {last_error}")
+    return None
 
-            if attempt < max_retries:
-                wait_time = 2 ** attempt
-                print(f"[RETRY] Waiting {wait_time}s before retry {attempt + 1}...")
-                await asyncio.sleep(wait_time)
 
-        except asyncio.TimeoutError:
-            last_error = TimeoutError(f"Query timed out after {timeout_seconds}s")
-            print(f"[ERROR] Request timed out after {timeout_seconds} seconds")
+# =============================================================================
+# CONCURRENT BATCH QUERIES
+# =============================================================================
 
-            if attempt < max_retries:
-                print(f"[RETRY] Attempt {attempt + 1}/{max_retries}...")
+async def batch_query(
+    prompts: List[str],
+    concurrency: int = 4,
+    **query_kwargs
+) -> List[Union[Optional[str], BaseException]]:
+    """
+    Run safe_query() for many prompts concurrently.
 
-        except ClaudeSDKError as e:
-            last_error = e
-            print(f"[ERROR] SDK error: {e}")
+    Each query spends its time waiting on the CLI process and the API, so a
+    few in flight at once gives near-linear speedup. The semaphore keeps
+    the number of live CLI processes at `concurrency` (2-8 works well).
 
-            if attempt < max_retries:
-                wait_time = 2 ** attempt
-                await asyncio.sleep(wait_time)
+    Args:
+        prompts: Prompts to send, one query each
+        concurrency: Maximum number of queries in flight
+        **query_kwargs: Passed through to safe_query (model, system_prompt, ...)
 
-        except Exception as e:
-            last_error = e
-            print(f"[ERROR] Unexpected error: {type(e).__name__}: {e}")
+    Returns:
+        One entry per prompt, in order: the response text, None if all
+        retries failed, or the exception raised (e.g. ClaudeAuthError)
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
 
-            if attempt < max_retries:
-                wait_time = 2 ** attempt
-                await asyncio.sleep(wait_time)
+    async def _one(prompt: str) -> Optional[str]:
+        async with semaphore:
+            return await safe_query(prompt, **query_kwargs)
 
-    # All retries exhausted
-    print(f"[FAILED] All {max_retries} attempts failed. Last error: {last_error}")
-    return None
+    return await asyncio.gather(*[_one(p) for p in prompts], return_exceptions=True)
 
 
 # =============================================================================
@@ -212,11 +507,13 @@ async def safe_query(
 async def main():
     """Example showing production-ready error handling"""
 
+    use_pidfd_child_watcher()
+
     print("Claude Code Authentication - Production Example\n")
 
     # Step 1: Check prerequisites at startup (fail fast)
     try:
-        check_prerequisites()
+        await check_prerequisites_async()
         print("[OK] Prerequisites verified\n")
     except ClaudeAuthError as e:
         print(f"[SETUP ERROR]\n{e}")
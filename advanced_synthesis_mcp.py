@@ -10,7 +10,13 @@ This gives you programmatic control over what the agent can and cannot do.
 """
 
 import json
+import time
 import asyncio
+import hashlib
+import itertools
+import os
+import shutil
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import Dict, List, Optional
 import logging
@@ -32,12 +38,69 @@ logger = logging.getLogger(__name__)
 # Custom Tools for Note Synthesis
 # ==============================================================================
 
+# Markers scanned for by check_quality and enforce_quality_hook (lowercase)
+KEVIN_PHRASES = ('production', 'real-world', 'actually', 'gotcha')
+BAD_MARKERS = ('automated', 'script', 'processed files')
+WRITE_AUTOMATION_MARKERS = ('automated', 'batch processed', 'script generated')
+
+# Files synthesized at once by AdvancedSynthesisApp.process_batch
+DEFAULT_CONCURRENCY = 4
+
+# Largest cleaned transcript sent for synthesis
+MAX_TRANSCRIPT_CHARS = 50000
+
+# Completed syntheses, keyed by transcript content (see synthesis_cache_path).
+# Kept next to this script, so runs from any working directory share it.
+SYNTHESIS_CACHE_DIR = Path(__file__).parent / '.synthesis_cache'
+
+# API budget: one credit per CHARS_PER_CREDIT transcript characters (0 disables)
+DEFAULT_CREDITS_PER_MINUTE = 400
+CHARS_PER_CREDIT = 1000
+
+class SynthesisStats:
+    """
+    Running totals shared by the synthesis tools
+    
+    Updates happen on the event loop thread with no await in between, so
+    concurrent tool calls cannot interleave inside record_quality().
+    """
+    __slots__ = ('files_processed', 'total_quality', 'current_file')
+    
+    def __init__(self):
+        self.files_processed = 0
+        self.total_quality = 0.0
+        self.current_file: Optional[str] = None
+    
+    def record_quality(self, score: float) -> None:
+        self.total_quality += score
+        self.files_processed += 1
+    
+    @property
+    def average_quality(self) -> float:
+        return self.total_quality / max(self.files_processed, 1)
+
 # Global state for tracking
-synthesis_stats = {
-    'files_processed': 0,
-    'total_quality': 0,
-    'current_file': None
-}
+synthesis_stats = SynthesisStats()
+
+# Cleaned transcripts being synthesized, by a short opaque ID ("t0", "t1",
+# ...). The prompt carries the ID and synthesize_transcript looks the text
+# up here, so the transcript is never copied into the prompt. IDs rather
+# than paths: the model echoes "t3" back reliably, a Windows path not always.
+transcripts_in_flight: Dict[str, str] = {}
+_transcript_ids = itertools.count()
+
+def transcript_key(transcript_id) -> str:
+    """Normalize a transcript ID as echoed back by the model"""
+    return str(transcript_id).strip().strip('"\'').lower()
+
+def notes_path_for(srt_path: Path) -> Path:
+    """Notes file written next to an SRT file"""
+    return srt_path.parent / f"{srt_path.stem}_KevinTheAntagonizer_Notes.md"
+
+def synthesis_cache_path(transcript: str, course_name: str, lecture_name: str) -> Path:
+    """Cache entry for a transcript synthesized under a given course and lecture"""
+    key = hashlib.sha256('\0'.join((transcript, course_name, lecture_name)).encode('utf-8')).hexdigest()
+    return SYNTHESIS_CACHE_DIR / f"{key}.json"
 
 @tool(
     name="synthesize_transcript",
@@ -45,11 +108,11 @@ synthesis_stats = {
     input_schema={
         "type": "object",
         "properties": {
-            "transcript": {"type": "string", "description": "The transcript text to synthesize"},
+            "transcript_id": {"type": "string", "description": "Transcript ID given in the request (e.g. t0)"},
             "lecture_name": {"type": "string", "description": "Name of the lecture"},
             "course_name": {"type": "string", "description": "Name of the course"}
         },
-        "required": ["transcript", "lecture_name", "course_name"]
+        "required": ["transcript_id", "lecture_name", "course_name"]
     }
 )
 async def synthesize_transcript(args):
@@ -57,12 +120,24 @@ async def synthesize_transcript(args):
     Custom tool that enforces synthesis constraints
     This runs IN-PROCESS, giving you full control
     """
-    transcript = args['transcript']
     lecture_name = args['lecture_name']
     course_name = args['course_name']
     
+    # The transcript is handed over in-process, so the model never has to
+    # echo it back as a tool argument
+    transcript = transcripts_in_flight.get(transcript_key(args['transcript_id']))
+    if transcript is None:
+        return {
+            "content": [
+                {
+                    "type": "text",
+                    "text": f"No transcript loaded for ID: {args['transcript_id']}"
+                }
+            ]
+        }
+    
     # Track what we're processing
-    synthesis_stats['current_file'] = lecture_name
+    synthesis_stats.current_file = lecture_name
     
     # Build the synthesis prompt with constraints
     synthesis_prompt = f"""
@@ -112,10 +187,11 @@ async def check_quality(args):
     score = 0.0
     
     # Length check
-    if len(content) >= 1500:
+    length = len(content)
+    if length >= 1500:
         score += 0.25
     else:
-        issues.append(f"Too short: {len(content)} chars")
+        issues.append(f"Too short: {length} chars")
     
     # Structure check
     if '##' in content or '###' in content:
@@ -123,24 +199,24 @@ async def check_quality(args):
     else:
         issues.append("Missing headers")
     
+    # The checks above match literal text; lowercase once for the phrase checks
+    content_lower = content.lower()
+    
     # Kevin's voice
-    kevin_phrases = ['production', 'real-world', 'actually', 'gotcha']
-    if any(phrase in content.lower() for phrase in kevin_phrases):
+    if any(phrase in content_lower for phrase in KEVIN_PHRASES):
         score += 0.25
     else:
         issues.append("Missing personality")
     
     # No automation markers
-    bad_markers = ['automated', 'script', 'processed files']
-    if not any(marker in content.lower() for marker in bad_markers):
+    if not any(marker in content_lower for marker in BAD_MARKERS):
         score += 0.25
     else:
         issues.append("AUTOMATION DETECTED")
         score = 0
     
     # Update stats
-    synthesis_stats['total_quality'] += score
-    synthesis_stats['files_processed'] += 1
+    synthesis_stats.record_quality(score)
     
     result = {
         "quality_score": score,
@@ -176,11 +252,14 @@ async def save_notes(args):
     content = args['content']
     srt_path = Path(args['srt_path'])
     
-    output_path = srt_path.parent / f"{srt_path.stem}_KevinTheAntagonizer_Notes.md"
+    output_path = notes_path_for(srt_path)
     
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        # Encode once and write the bytes on the default thread pool, so
+        # concurrent syntheses keep running and no text-layer wrapper is used
+        data = content.encode('utf-8')
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, output_path.write_bytes, data)
         
         return {
             "content": [
@@ -204,21 +283,34 @@ async def save_notes(args):
 # Custom Hooks for Process Control
 # ==============================================================================
 
+# Tools each hook acts on; any other tool returns before touching tool_input
+BLOCKED_TOOLS = frozenset({"RunPython", "CreatePythonScript"})
+QUALITY_CHECKED_TOOLS = frozenset({"Write"})
+
+# Deny responses are built once and shared - treat them as read-only
+DENY_AUTOMATION = {
+    "hookSpecificOutput": {
+        "hookEventName": "PreToolUse",
+        "permissionDecision": "deny",
+        "permissionDecisionReason": "Automation scripts are not allowed. You must synthesize manually."
+    }
+}
+
+DENY_AUTO_GENERATED = {
+    "hookSpecificOutput": {
+        "hookEventName": "PreToolUse",
+        "permissionDecision": "deny",
+        "permissionDecisionReason": "Content appears to be auto-generated. Manual synthesis required."
+    }
+}
+
 async def prevent_automation_hook(input_data, tool_use_id, context):
     """
     Hook that prevents Claude from writing automation scripts
     """
-    tool_name = input_data.get("tool_name", "")
-    
     # Block Python execution and script creation
-    if tool_name in ["RunPython", "CreatePythonScript"]:
-        return {
-            "hookSpecificOutput": {
-                "hookEventName": "PreToolUse",
-                "permissionDecision": "deny",
-                "permissionDecisionReason": "Automation scripts are not allowed. You must synthesize manually."
-            }
-        }
+    if input_data.get("tool_name", "") in BLOCKED_TOOLS:
+        return DENY_AUTOMATION
     
     # Allow other tools
     return {}
@@ -227,21 +319,14 @@ async def enforce_quality_hook(input_data, tool_use_id, context):
     """
     Hook that enforces quality standards on Write operations
     """
-    tool_name = input_data.get("tool_name", "")
-    tool_input = input_data.get("tool_input", {})
+    if input_data.get("tool_name", "") not in QUALITY_CHECKED_TOOLS:
+        return {}
     
-    if tool_name == "Write":
-        content = tool_input.get("content", "")
-        
-        # Check for automation markers
-        if any(marker in content.lower() for marker in ['automated', 'batch processed', 'script generated']):
-            return {
-                "hookSpecificOutput": {
-                    "hookEventName": "PreToolUse",
-                    "permissionDecision": "deny",
-                    "permissionDecisionReason": "Content appears to be auto-generated. Manual synthesis required."
-                }
-            }
+    content_lower = input_data.get("tool_input", {}).get("content", "").lower()
+    
+    # Check for automation markers
+    if any(marker in content_lower for marker in WRITE_AUTOMATION_MARKERS):
+        return DENY_AUTO_GENERATED
     
     return {}
 
@@ -249,139 +334,290 @@ async def enforce_quality_hook(input_data, tool_use_id, context):
 # Main Synthesis Application
 # ==============================================================================
 
-class AdvancedSynthesisApp:
+# Request sent for each file; the transcript itself is fetched by the
+# synthesize_transcript tool from transcript_id
+SYNTHESIS_PROMPT = """Process this transcript using the synthesis tools:
+            
+1. Use synthesize_transcript tool with:
+   - transcript_id: "{transcript_id}"
+   - lecture_name: "{lecture_name}"
+   - course_name: "{course_name}"
+
+2. Check the quality with check_quality tool
+
+3. If quality passes, save with save_notes tool to: {srt_path}"""
+
+class CreditLimiter:
     """
-    Advanced synthesis using SDK MCP servers and custom tools
+    Token bucket that charges each request by transcript size
+    
+    Refills at credits_per_minute and holds at most one minute of budget, so
+    small files go straight through while large ones wait only as long as
+    the budget needs. Requests are served in arrival order.
+    credits_per_minute=0 disables limiting.
     """
     
-    def __init__(self):
-        # Create an in-process MCP server with our custom tools
-        self.mcp_server = create_sdk_mcp_server(
-            name="synthesis-tools",
-            version="1.0.0",
-            tools=[synthesize_transcript, check_quality, save_notes]
-        )
+    def __init__(self, credits_per_minute: int):
+        self.rate = credits_per_minute / 60.0  # Credits per second
+        self.capacity = float(credits_per_minute)
+        self._credits = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self, credits: int = 1):
+        """Wait until `credits` are available, then spend them"""
+        if not self.rate:
+            return
         
-        # Configure agent options
-        self.options = ClaudeAgentOptions(
-            system_prompt="""You are Kevin Burleigh, a battle-tested Java/Spring Boot architect.
+        # A single request larger than the bucket waits for a full bucket
+        credits = min(credits, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._credits = min(self.capacity, self._credits + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._credits >= credits:
+                    self._credits -= credits
+                    return
+                await asyncio.sleep((credits - self._credits) / self.rate)
+
+@lru_cache(maxsize=None)
+def get_synthesis_options() -> ClaudeAgentOptions:
+    """
+    Agent options wired to the synthesis tools, built once per process
+
+    The in-process MCP server holds no per-batch state, so every
+    AdvancedSynthesisApp shares the same server and options.
+    """
+    # Create an in-process MCP server with our custom tools
+    mcp_server = create_sdk_mcp_server(
+        name="synthesis-tools",
+        version="1.0.0",
+        tools=[synthesize_transcript, check_quality, save_notes]
+    )
+    
+    # Configure agent options
+    return ClaudeAgentOptions(
+        system_prompt="""You are Kevin Burleigh, a battle-tested Java/Spring Boot architect.
 You synthesize transcripts into comprehensive learning notes.
 You MUST use the provided synthesis tools.
 You CANNOT write automation scripts.""",
-            
-            # Register our MCP server
-            mcp_servers={"synthesis": self.mcp_server},
-            
-            # Allow our custom tools
-            allowed_tools=[
-                "mcp__synthesis__synthesize_transcript",
-                "mcp__synthesis__check_quality", 
-                "mcp__synthesis__save_notes",
-                "Read",
-                "Write"
-            ],
-            
-            # Explicitly disallow automation tools
-            disallowed_tools=["RunPython", "CreatePythonScript", "Bash"],
-            
-            # Add hooks for additional control
-            hooks={
-                "PreToolUse": [
-                    HookMatcher(matcher="*", hooks=[prevent_automation_hook, enforce_quality_hook])
-                ]
-            },
-            
-            permission_mode='default'  # Use default permission handling
-        )
+        
+        # Register our MCP server
+        mcp_servers={"synthesis": mcp_server},
+        
+        # Allow our custom tools
+        allowed_tools=[
+            "mcp__synthesis__synthesize_transcript",
+            "mcp__synthesis__check_quality", 
+            "mcp__synthesis__save_notes",
+            "Read",
+            "Write"
+        ],
+        
+        # Explicitly disallow automation tools
+        disallowed_tools=["RunPython", "CreatePythonScript", "Bash"],
+        
+        # Add hooks for additional control
+        hooks={
+            "PreToolUse": [
+                HookMatcher(matcher="*", hooks=[prevent_automation_hook, enforce_quality_hook])
+            ]
+        },
+        
+        permission_mode='default'  # Use default permission handling
+    )
+
+class AdvancedSynthesisApp:
+    """
+    Advanced synthesis using SDK MCP servers and custom tools
+    """
+    
+    def __init__(self, credits_per_minute: int = DEFAULT_CREDITS_PER_MINUTE):
+        # Shared API budget, charged per file by transcript length
+        self.rate_limiter = CreditLimiter(credits_per_minute)
+        
+        # Shared agent options and in-process MCP server (see get_synthesis_options)
+        self.options = get_synthesis_options()
+        self.mcp_server = self.options.mcp_servers["synthesis"]
     
     async def process_file(self, srt_path: str, course_name: str, lecture_name: str):
         """
         Process a single file using our custom synthesis pipeline
+        
+        A client is opened for the synthesis only, so files rejected or served
+        from the cache never start a CLI. Clients are not reused across files:
+        the CLI process keeps its conversation, so a reused client would carry
+        earlier transcripts into later ones.
         """
-        logger.info(f"Processing: {lecture_name}")
+        logger.info("Processing: %s", lecture_name)
         
-        # Read and clean the SRT content
-        transcript = self.clean_srt(srt_path)
+        # File I/O runs on the default thread pool: SRTs often sit on network
+        # drives, and a slow read must not stall the other files in the batch
+        loop = asyncio.get_running_loop()
+        
+        # Read and clean the SRT content. How much an SRT shrinks depends on
+        # its cue density, so big files are read too; clean_srt stops as soon
+        # as the cleaned text passes the limit.
+        transcript = await loop.run_in_executor(
+            None, partial(self.clean_srt, srt_path, max_chars=MAX_TRANSCRIPT_CHARS)
+        )
         
         if not transcript:
-            logger.error(f"Failed to read {srt_path}")
+            logger.error("Failed to read %s", srt_path)
             return False
         
         # Check size
-        if len(transcript) > 50000:
-            logger.warning(f"File too large: {lecture_name}")
+        if len(transcript) > MAX_TRANSCRIPT_CHARS:
+            logger.warning("File too large: %s", lecture_name)
             return False
         
+        # Identical transcripts that were already synthesized skip the LLM
+        cache_path = synthesis_cache_path(transcript, course_name, lecture_name)
+        if await loop.run_in_executor(None, self.reuse_cached_notes, cache_path, srt_path):
+            logger.info("✓ Cached: %s", lecture_name)
+            return True
+        
         # Use SDK client for interactive processing
         async with ClaudeSDKClient(options=self.options) as client:
-            # Send the synthesis request
-            prompt = f"""Process this transcript using the synthesis tools:
-            
-1. Use synthesize_transcript tool with:
-   - transcript: (provided below)
-   - lecture_name: "{lecture_name}"
-   - course_name: "{course_name}"
-
-2. Check the quality with check_quality tool
-
-3. If quality passes, save with save_notes tool to: {srt_path}
-
-Transcript:
-{transcript}"""
+            saved = await self.synthesize_file(client, srt_path, course_name, lecture_name, transcript)
+        
+        if saved:
+            await loop.run_in_executor(None, self.record_synthesis, cache_path, srt_path)
+        return saved
+    
+    def reuse_cached_notes(self, cache_path: Path, srt_path: str) -> bool:
+        """
+        True if cache_path points at existing notes, copying them next to
+        srt_path when they were written for a different copy of the file
+        """
+        try:
+            cached = json.loads(cache_path.read_text(encoding='utf-8'))
+            notes_path = Path(cached['notes_path'])
+            if not notes_path.is_file():
+                return False
             
+            target = notes_path_for(Path(srt_path))
+            if target != notes_path and not target.exists():
+                shutil.copyfile(notes_path, target)
+            return True
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+    
+    def record_synthesis(self, cache_path: Path, srt_path: str) -> None:
+        """Remember where the notes for this transcript were saved"""
+        notes_path = notes_path_for(Path(srt_path))
+        if not notes_path.is_file():
+            return
+        
+        try:
+            SYNTHESIS_CACHE_DIR.mkdir(exist_ok=True)
+            tmp_path = cache_path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps({'notes_path': str(notes_path.resolve())}), encoding='utf-8')
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning("Could not cache synthesis for %s: %s", srt_path, e)
+    
+    async def synthesize_file(self, client: ClaudeSDKClient, srt_path: str, course_name: str,
+                              lecture_name: str, transcript: str) -> bool:
+        """Run the synthesis conversation for one transcript on a connected client"""
+        # Send the synthesis request
+        transcript_id = f"t{next(_transcript_ids)}"
+        prompt = SYNTHESIS_PROMPT.format(
+            transcript_id=transcript_id,
+            srt_path=srt_path,
+            lecture_name=lecture_name,
+            course_name=course_name
+        )
+        
+        # Wait for enough API budget for this transcript
+        await self.rate_limiter.acquire(max(1, len(transcript) // CHARS_PER_CREDIT))
+        
+        transcripts_in_flight[transcript_id] = transcript
+        try:
             await client.query(prompt)
             
-            # Collect the response
-            full_response = ""
+            # Check each text block for the save confirmation as it arrives. The
+            # stream is still read to the end, so the conversation (which may
+            # still be running tools) finishes before the client is closed.
+            saved = False
             async for msg in client.receive_response():
-                if isinstance(msg, AssistantMessage):
+                if not saved and isinstance(msg, AssistantMessage):
                     for block in msg.content:
-                        if isinstance(block, TextBlock):
-                            full_response += block.text
-            
-            # Check if successful
-            if "saved to" in full_response.lower():
-                logger.info(f"✓ Completed: {lecture_name}")
-                return True
-            else:
-                logger.warning(f"Failed to process: {lecture_name}")
-                return False
+                        if isinstance(block, TextBlock) and "saved to" in block.text.lower():
+                            saved = True
+                            break
+        finally:
+            transcripts_in_flight.pop(transcript_id, None)
+        
+        # Check if successful
+        if saved:
+            logger.info("✓ Completed: %s", lecture_name)
+            return True
+        else:
+            logger.warning("Failed to process: %s", lecture_name)
+            return False
     
-    def clean_srt(self, srt_path: str) -> Optional[str]:
-        """Clean SRT file content"""
+    def clean_srt(self, srt_path: str, max_chars: Optional[int] = None) -> Optional[str]:
+        """
+        Clean SRT file content
+        
+        With max_chars, reading stops as soon as the cleaned text is longer
+        than max_chars; the partial result is returned so callers still see
+        it as oversize.
+        """
         try:
-            with open(srt_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
+            # Iterate the file directly so the whole SRT is never held as one string
             lines = []
-            for line in content.split('\n'):
-                line = line.strip()
-                if line and not line.isdigit() and '-->' not in line:
-                    lines.append(line)
+            joined_length = -1  # Length of ' '.join(lines)
+            with open(srt_path, 'r', encoding='utf-8', errors='ignore') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.isdigit() and '-->' not in line:
+                        # Collapse inner whitespace runs; they only cost tokens
+                        if '  ' in line or '\t' in line:
+                            line = ' '.join(line.split())
+                        lines.append(line)
+                        joined_length += len(line) + 1
+                        if max_chars is not None and joined_length > max_chars:
+                            break
             
             return ' '.join(lines)
         except Exception as e:
-            logger.error(f"Error reading file: {e}")
+            logger.error("Error reading file: %s", e)
             return None
     
-    async def process_batch(self, files: List[Dict]):
-        """Process a batch of files"""
-        success_count = 0
+    async def process_batch(self, files: List[Dict], concurrency: int = DEFAULT_CONCURRENCY):
+        """
+        Process a batch of files, up to `concurrency` at a time
+        
+        Each file in flight opens its own client only if it needs synthesis,
+        so at most `concurrency` CLI processes run at once.
+        """
+        file_slots = asyncio.Semaphore(max(1, concurrency))
+        
+        async def process_one(file_info: Dict) -> bool:
+            async with file_slots:
+                return await self.process_file(
+                    file_info['srt_path'],
+                    file_info['course_name'],
+                    file_info['lecture_name']
+                )
+        
+        results = await asyncio.gather(
+            *[process_one(file_info) for file_info in files],
+            return_exceptions=True
+        )
         
-        for file_info in files:
-            if await self.process_file(
-                file_info['srt_path'],
-                file_info['course_name'],
-                file_info['lecture_name']
-            ):
+        success_count = 0
+        for file_info, result in zip(files, results):
+            if isinstance(result, BaseException):
+                logger.error("Error processing %s: %s", file_info['lecture_name'], result)
+            elif result:
                 success_count += 1
-            
-            # Brief pause between files
-            await asyncio.sleep(1)
         
-        avg_quality = synthesis_stats['total_quality'] / max(synthesis_stats['files_processed'], 1)
-        logger.info(f"Batch complete: {success_count}/{len(files)} successful")
-        logger.info(f"Average quality: {avg_quality:.2%}")
+        logger.info("Batch complete: %d/%d successful", success_count, len(files))
+        logger.info("Average quality: %.2f%%", synthesis_stats.average_quality * 100)
         
         return success_count
 
@@ -419,10 +655,17 @@ async def main():
     ╔══════════════════════════════════════════════════════════╗
     ║                      Results                             ║
     ╠══════════════════════════════════════════════════════════╣
-    ║  Files Processed: {synthesis_stats['files_processed']:3d}                                     ║
-    ║  Average Quality: {synthesis_stats['total_quality'] / max(synthesis_stats['files_processed'], 1):.2%}                                  ║
+    ║  Files Processed: {synthesis_stats.files_processed:3d}                                     ║
+    ║  Average Quality: {synthesis_stats.average_quality:.2%}                                  ║
     ╚══════════════════════════════════════════════════════════╝
     """)
 
 if __name__ == "__main__":
+    # uvloop is optional (and unavailable on Windows); the stock loop works too
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    
     asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+Tests for FileProcessor.clean_srt_with_tokens
+
+Run with: python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import KevinTheAntagonizerClaudeCodeNotesMaker as notes_maker
+from KevinTheAntagonizerClaudeCodeNotesMaker import FileProcessor
+
+
+class CleanSrtTests(unittest.TestCase):
+
+    def clean_with_tokens(self, raw: bytes, max_chars=None):
+        fd, path = tempfile.mkstemp(suffix='.srt')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(raw)
+            return FileProcessor.clean_srt_with_tokens(path, max_chars=max_chars)
+        finally:
+            os.remove(path)
+
+    def clean(self, raw: bytes) -> str:
+        return self.clean_with_tokens(raw)[0]
+
+    def test_strips_cue_numbers_and_timecodes(self):
+        raw = (b"1\n00:00:01,000 --> 00:00:02,000\nHello there\n\n"
+               b"2\n00:00:02,000 --> 00:00:03,000\nGeneral Kenobi\n")
+        self.assertEqual(self.clean(raw), "Hello there General Kenobi")
+
+    def test_first_cue_number_after_bom(self):
+        raw = b"\xef\xbb\xbf1\r\n00:00:01,000 --> 00:00:02,000\r\nHello\r\n"
+        self.assertEqual(self.clean(raw), "Hello")
+
+    def test_cue_numbers_with_surrounding_whitespace(self):
+        raw = (b"  1  \n00:00:01,000 --> 00:00:02,000\nHello\n\n"
+               b"\t2\r\n00:00:02,000 --> 00:00:03,000\nworld\n")
+        self.assertEqual(self.clean(raw), "Hello world")
+
+    def test_cr_only_line_endings(self):
+        raw = (b"1\r00:00:01,000 --> 00:00:02,000\rHello there\r\r"
+               b"2\r00:00:02,000 --> 00:00:03,000\rGeneral Kenobi\r")
+        self.assertEqual(self.clean(raw), "Hello there General Kenobi")
+
+    def test_mixed_cr_and_lf_line_endings(self):
+        raw = (b"\xef\xbb\xbf1\r\n00:00:01,000 --> 00:00:02,000\r\nHello 42\r\n\r\n"
+               b" 2 \r00:00:02,000 --> 00:00:03,000\rthere\n")
+        self.assertEqual(self.clean(raw), "Hello 42 there")
+
+    def test_keeps_numbers_inside_caption_text(self):
+        raw = b"1\n00:00:01,000 --> 00:00:02,000\nUse port 8080\n2 beans\n"
+        self.assertEqual(self.clean(raw), "Use port 8080 2 beans")
+
+    def test_empty_file(self):
+        self.assertEqual(self.clean(b""), "")
+
+    def test_chunked_cleaning_matches_single_pass(self):
+        for newline in (b"\n", b"\r\n", b"\r"):
+            raw = b"\xef\xbb\xbf" + b"".join(
+                b"%d%s00:00:01,000 --> 00:00:02,000%sline  %d\t\xc3\xa9%s%s" % (
+                    i, newline, newline, i, newline, newline)
+                for i in range(1, 200))
+            expected = self.clean_with_tokens(raw)
+            with mock.patch.object(notes_maker, 'SRT_CLEAN_CHUNK_BYTES', 100):
+                self.assertEqual(self.clean_with_tokens(raw), expected)
+
+    def test_max_chars_stops_early_but_stays_oversize(self):
+        raw = b"".join(b"%d\n00:00:01,000 --> 00:00:02,000\nsome caption text\n\n" % i
+                       for i in range(1, 2000))
+        full = self.clean(raw)
+        with mock.patch.object(notes_maker, 'SRT_CLEAN_CHUNK_BYTES', 1024):
+            partial = self.clean_with_tokens(raw, max_chars=500)[0]
+        self.assertGreater(len(partial), 500)
+        self.assertLess(len(partial), len(full))
+        self.assertTrue(full.startswith(partial))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Tests for DatabaseManager's status update journal
+
+Run with: python -m unittest discover -s tests
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from KevinTheAntagonizerClaudeCodeNotesMaker import DatabaseManager, try_lock_file
+
+
+class UpdateJournalTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = Path(self.tmp_dir) / 'tasks.db'
+        db = DatabaseManager(self.db_path)
+        db.add_task('/course/lecture.srt', 'Course', 'Lecture', 10)
+        db.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def journal_paths(self):
+        return sorted(Path(self.tmp_dir).glob('tasks.db.updates*.jsonl'))
+
+    def write_journal(self, name, *updates):
+        path = Path(self.tmp_dir) / name
+        path.write_text(''.join(json.dumps(u) + '\n' for u in updates), encoding='utf-8')
+        return path
+
+    def task_row(self):
+        db = DatabaseManager(self.db_path)
+        try:
+            return tuple(db.conn.execute(
+                "SELECT status, attempts, error_message FROM tasks WHERE id = 1").fetchone())
+        finally:
+            db.close()
+
+    def test_crash_before_flush_is_replayed_on_reopen(self):
+        # The child journals one update and dies without flushing or closing
+        script = textwrap.dedent(f"""
+            import os, sys
+            from pathlib import Path
+            sys.path.insert(0, {REPO_ROOT!r})
+            from KevinTheAntagonizerClaudeCodeNotesMaker import DatabaseManager
+            DatabaseManager.UPDATE_FLUSH_SECONDS = 3600
+            db = DatabaseManager(Path({str(self.db_path)!r}))
+            db.update_task_status(1, 'failed', error_message='boom')
+            os._exit(0)
+        """)
+        subprocess.run([sys.executable, '-c', script], check=True, cwd=self.tmp_dir)
+        self.assertEqual(len(self.journal_paths()), 1)
+
+        self.assertEqual(self.task_row(), ('failed', 1, 'boom'))
+        self.assertEqual(self.journal_paths(), [])
+
+    def test_replaying_the_same_updates_twice_is_idempotent(self):
+        update = {'id': 1, 'status': 'failed', 'attempts': 2, 'error_message': 'boom'}
+        self.write_journal('tasks.db.updates.1.jsonl', update)
+        self.write_journal('tasks.db.updates.2.jsonl', update)
+
+        self.assertEqual(self.task_row(), ('failed', 2, 'boom'))
+        self.assertEqual(self.journal_paths(), [])
+
+    def test_journal_of_a_running_process_is_left_alone(self):
+        path = self.write_journal('tasks.db.updates.1.jsonl',
+                                  {'id': 1, 'status': 'completed', 'attempts': 1})
+        with open(path, 'a', encoding='utf-8') as live:
+            self.assertTrue(try_lock_file(live))
+            self.assertEqual(self.task_row(), ('pending', 0, None))
+            self.assertTrue(path.exists())
+
+        # Once its owner is gone, the next start picks it up
+        self.assertEqual(self.task_row(), ('completed', 1, None))
+
+    def test_reset_removes_journals(self):
+        self.write_journal('tasks.db.updates.1.jsonl',
+                           {'id': 1, 'status': 'completed', 'attempts': 1})
+        with contextlib.redirect_stdout(io.StringIO()):
+            DatabaseManager(self.db_path, reset=True).close()
+        self.assertEqual(self.journal_paths(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()